@@ -216,6 +216,30 @@ def ensure_default_users() -> None:
 
 
 def get_current_user(request: Request) -> UserRow:
+    # Route dependencies and template helpers may both ask for the user; resolve once per request.
+    cached = getattr(request.state, "current_user", None)
+    if cached is not None:
+        return cached
+
+    user = _resolve_current_user(request)
+    request.state.current_user = user
+    return user
+
+
+def get_request_permissions(request: Request, *, user: UserRow) -> set[str]:
+    # Keyed by username: a request may ask about a user other than the current one
+    cache = getattr(request.state, "_perms_cache", None)
+    if cache is None:
+        cache = {}
+        request.state._perms_cache = cache
+    perms = cache.get(user.username)
+    if perms is None:
+        perms = get_permissions_for_user(user=user)
+        cache[user.username] = perms
+    return perms
+
+
+def _resolve_current_user(request: Request) -> UserRow:
     session_username = None
     try:
         session_username = (request.session.get("username") or "").strip().lower()  # type: ignore[attr-defined]
@@ -252,12 +276,13 @@ def require_role(*allowed_roles: str):
 
 
 def require_any_permission(*required: str):
-    def _dep(user: UserRow = Depends(get_current_user)) -> UserRow:
-        needed = [p.strip() for p in required if (p or "").strip()]
+    needed = [p.strip() for p in required if (p or "").strip()]
+
+    def _dep(request: Request, user: UserRow = Depends(get_current_user)) -> UserRow:
         if not needed:
             return user
 
-        perms = get_permissions_for_user(user=user)
+        perms = get_request_permissions(request, user=user)
         ok = any(p in perms for p in needed)
         if not ok:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -267,12 +292,13 @@ def require_any_permission(*required: str):
 
 
 def require_permission(*required: str):
-    def _dep(user: UserRow = Depends(get_current_user)) -> UserRow:
-        needed = [p.strip() for p in required if (p or "").strip()]
+    needed = [p.strip() for p in required if (p or "").strip()]
+
+    def _dep(request: Request, user: UserRow = Depends(get_current_user)) -> UserRow:
         if not needed:
             return user
 
-        perms = get_permissions_for_user(user=user)
+        perms = get_request_permissions(request, user=user)
         ok = all(p in perms for p in needed)
         if not ok:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
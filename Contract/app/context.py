@@ -1,3 +1,4 @@
 REGION_CODE = "HĐQTGAN-PN"
 FIELD_CODE = "MR"
 FIELD_NAME = "Sao chép trực tuyến"
+DEFAULT_CHUC_VU = "Giám đốc"
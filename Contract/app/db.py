@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import atexit
+import functools
+import random
+import time
 from contextlib import contextmanager
 from pathlib import Path
 
 from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import Session, sessionmaker
 
 from app.config import STORAGE_DIR
@@ -17,11 +22,15 @@ def _sqlite_url(path: Path) -> str:
     return "sqlite:///" + path.resolve().as_posix()
 
 
+# Keep a warm pool of SQLite connections shared by all request threads. A local
+# file connection can't go stale, so the per-checkout pre-ping round trip is skipped.
 engine = create_engine(
     _sqlite_url(DB_PATH),
     connect_args={"check_same_thread": False},
-    pool_pre_ping=True,
+    pool_size=10,
+    max_overflow=20,
 )
+atexit.register(engine.dispose)
 
 SessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False, expire_on_commit=False)
 
@@ -39,6 +48,41 @@ def session_scope() -> Session:
         db.close()
 
 
+def _is_transient_sqlite_error(exc: OperationalError) -> bool:
+    msg = str(getattr(exc, "orig", exc)).lower()
+    return "database is locked" in msg or "database is busy" in msg
+
+
+def retry_db_operation(fn=None, *, max_retries: int = 4, base_delay: float = 0.2, max_delay: float = 10.0, jitter: bool = True):
+    """Retry a write that hit SQLite lock contention, with exponential backoff.
+
+    The wrapped function must open its own session (e.g. via session_scope) so every
+    attempt starts a fresh transaction. Other errors are re-raised immediately.
+    """
+
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            attempt = 0
+            while True:
+                try:
+                    return func(*args, **kwargs)
+                except OperationalError as e:
+                    if attempt >= max_retries or not _is_transient_sqlite_error(e):
+                        raise
+                    delay = min(max_delay, base_delay * (2**attempt))
+                    if jitter:
+                        delay = random.uniform(0, delay)
+                    time.sleep(delay)
+                    attempt += 1
+
+        return wrapper
+
+    if fn is not None:
+        return decorate(fn)
+    return decorate
+
+
 def get_db() -> Session:
     db = SessionLocal()
     try:
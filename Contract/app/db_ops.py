@@ -1,18 +1,98 @@
 from __future__ import annotations
 
+import threading
+import time
 from io import BytesIO
 from pathlib import Path
+from typing import Iterable, Sequence
 
 from openpyxl import Workbook
 from openpyxl.styles import Font
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
 
-from app.db import DB_PATH, session_scope
+from app.db import DB_PATH, retry_db_operation, session_scope
 from app.db_models import ContractRecordRow, WorkRow
 from app.services.excel_store import HEADERS, WORKS_HEADERS
 
 
 _HEADER_FONT = Font(bold=True)
 
+# Short-lived per-year cache for the contract list; every page render reads it.
+_ROWS_CACHE_TTL_SECONDS = 30.0
+_rows_cache: dict[int, tuple[float, list[dict]]] = {}
+_rows_cache_lock = threading.Lock()
+# Bumped by every invalidation; a read only caches its rows if no write landed while it queried.
+_rows_cache_generation = 0
+
+# Row dict key -> ContractRecordRow attribute. Keys keep the Excel/legacy casing (so_CCCD, *_GTGT_*).
+_CONTRACT_FIELD_MAP: tuple[tuple[str, str], ...] = (
+    ("contract_no", "contract_no"),
+    ("contract_year", "contract_year"),
+    ("annex_no", "annex_no"),
+    ("ngay_lap_hop_dong", "ngay_lap_hop_dong"),
+    ("linh_vuc", "linh_vuc"),
+    ("region_code", "region_code"),
+    ("field_code", "field_code"),
+    ("don_vi_ten", "don_vi_ten"),
+    ("don_vi_dia_chi", "don_vi_dia_chi"),
+    ("don_vi_dien_thoai", "don_vi_dien_thoai"),
+    ("don_vi_nguoi_dai_dien", "don_vi_nguoi_dai_dien"),
+    ("don_vi_chuc_vu", "don_vi_chuc_vu"),
+    ("don_vi_mst", "don_vi_mst"),
+    ("don_vi_email", "don_vi_email"),
+    ("so_CCCD", "so_cccd"),
+    ("ngay_cap_CCCD", "ngay_cap_cccd"),
+    ("kenh_ten", "kenh_ten"),
+    ("kenh_id", "kenh_id"),
+    ("nguoi_thuc_hien_email", "nguoi_thuc_hien_email"),
+    ("so_tien_nhuan_but_value", "so_tien_nhuan_but_value"),
+    ("so_tien_nhuan_but_text", "so_tien_nhuan_but_text"),
+    ("so_tien_chua_GTGT_value", "so_tien_chua_gtgt_value"),
+    ("so_tien_chua_GTGT_text", "so_tien_chua_gtgt_text"),
+    ("thue_percent", "thue_percent"),
+    ("thue_GTGT_value", "thue_gtgt_value"),
+    ("thue_GTGT_text", "thue_gtgt_text"),
+    ("so_tien_value", "so_tien_value"),
+    ("so_tien_text", "so_tien_text"),
+    ("so_tien_bang_chu", "so_tien_bang_chu"),
+    ("docx_path", "docx_path"),
+    ("catalogue_path", "catalogue_path"),
+)
+_CONTRACT_KEY_TO_ATTR: dict[str, str] = dict(_CONTRACT_FIELD_MAP)
+# Column projections: list/export queries select plain tuples instead of hydrating ORM entities.
+_CONTRACT_KEYS: tuple[str, ...] = tuple(key for key, _ in _CONTRACT_FIELD_MAP)
+_CONTRACT_COLUMNS = tuple(getattr(ContractRecordRow, attr) for _, attr in _CONTRACT_FIELD_MAP)
+
+_WORKS_FIELDS: tuple[str, ...] = (
+    "year",
+    "contract_no",
+    "annex_no",
+    "ngay_ky_hop_dong",
+    "ngay_ky_phu_luc",
+    "nguoi_thuc_hien",
+    "ten_kenh",
+    "id_channel",
+    "link_kenh",
+    "stt",
+    "id_link",
+    "youtube_url",
+    "id_work",
+    "musical_work",
+    "author",
+    "composer",
+    "lyricist",
+    "time_range",
+    "duration",
+    "effective_date",
+    "expiration_date",
+    "usage_type",
+    "royalty_rate",
+    "note",
+    "imported_at",
+)
+_WORKS_COLUMNS = tuple(getattr(WorkRow, f) for f in _WORKS_FIELDS)
+
 
 def _db_available() -> bool:
     try:
@@ -36,67 +116,119 @@ def _pick_latest_contract_year(default_year: int) -> int:
     return default_year
 
 
+def _apply_contract_fields(row: ContractRecordRow, values: dict) -> None:
+    for k, v in values.items():
+        attr = _CONTRACT_KEY_TO_ATTR.get(k)
+        if attr is not None:
+            setattr(row, attr, v)
+
+
+def _contract_row_query(db: Session, *, year: int, contract_no: str, annex_no: str | None):
+    q = (
+        db.query(ContractRecordRow)
+        .filter(ContractRecordRow.contract_year == year)
+        .filter(ContractRecordRow.contract_no == contract_no)
+    )
+    if annex_no is None:
+        return q.filter(ContractRecordRow.annex_no.is_(None))
+    return q.filter(ContractRecordRow.annex_no == annex_no)
+
+
+def _invalidate_rows_cache() -> None:
+    global _rows_cache_generation
+    # Writes may move a record between years, so drop every cached year.
+    with _rows_cache_lock:
+        _rows_cache_generation += 1
+        _rows_cache.clear()
+
+
 def _rows_from_db(*, year: int) -> list[dict]:
     if not _db_available():
         return []
 
-    with session_scope() as db:
-        q = db.query(ContractRecordRow).filter(ContractRecordRow.contract_year == year)
-        out: list[dict] = []
-        for r in q.all():
-            out.append(
-                {
-                    "contract_no": r.contract_no,
-                    "contract_year": r.contract_year,
-                    "annex_no": r.annex_no,
-                    "ngay_lap_hop_dong": r.ngay_lap_hop_dong,
-                    "linh_vuc": r.linh_vuc,
-                    "region_code": r.region_code,
-                    "field_code": r.field_code,
-                    "don_vi_ten": r.don_vi_ten,
-                    "don_vi_dia_chi": r.don_vi_dia_chi,
-                    "don_vi_dien_thoai": r.don_vi_dien_thoai,
-                    "don_vi_nguoi_dai_dien": r.don_vi_nguoi_dai_dien,
-                    "don_vi_chuc_vu": r.don_vi_chuc_vu,
-                    "don_vi_mst": r.don_vi_mst,
-                    "don_vi_email": r.don_vi_email,
-                    "so_CCCD": r.so_cccd,
-                    "ngay_cap_CCCD": r.ngay_cap_cccd,
-                    "kenh_ten": r.kenh_ten,
-                    "kenh_id": r.kenh_id,
-                    "nguoi_thuc_hien_email": r.nguoi_thuc_hien_email,
-                    "so_tien_nhuan_but_value": r.so_tien_nhuan_but_value,
-                    "so_tien_nhuan_but_text": r.so_tien_nhuan_but_text,
-                    "so_tien_chua_GTGT_value": r.so_tien_chua_gtgt_value,
-                    "so_tien_chua_GTGT_text": r.so_tien_chua_gtgt_text,
-                    "thue_percent": r.thue_percent,
-                    "thue_GTGT_value": r.thue_gtgt_value,
-                    "thue_GTGT_text": r.thue_gtgt_text,
-                    "so_tien_value": r.so_tien_value,
-                    "so_tien_text": r.so_tien_text,
-                    "so_tien_bang_chu": r.so_tien_bang_chu,
-                    "docx_path": r.docx_path,
-                    "catalogue_path": r.catalogue_path,
-                }
-            )
-        return out
+    now = time.monotonic()
+    with _rows_cache_lock:
+        hit = _rows_cache.get(year)
+        generation = _rows_cache_generation
+    if hit is not None and now - hit[0] < _ROWS_CACHE_TTL_SECONDS:
+        rows = hit[1]
+    else:
+        with session_scope() as db:
+            q = db.query(*_CONTRACT_COLUMNS).filter(ContractRecordRow.contract_year == year)
+            rows = [dict(zip(_CONTRACT_KEYS, r)) for r in q]
+        with _rows_cache_lock:
+            # A write committed meanwhile may not be in these rows: serve them, don't cache them.
+            if generation == _rows_cache_generation:
+                _rows_cache[year] = (now, rows)
 
+    # Callers annotate/mutate the dicts, so hand out copies of the cached rows.
+    return [dict(r) for r in rows]
+
+
+def _rows_for_contract(*, year: int, contract_no: str) -> list[dict]:
+    """A contract and all of its annexes in one indexed query (ix_contract_year_contract_no)."""
+    if not _db_available():
+        return []
 
-def _db_get_contract_row(*, year: int, contract_no: str, annex_no: str | None) -> ContractRecordRow | None:
     with session_scope() as db:
-        return (
-            db.query(ContractRecordRow)
+        q = (
+            db.query(*_CONTRACT_COLUMNS)
             .filter(ContractRecordRow.contract_year == year)
             .filter(ContractRecordRow.contract_no == contract_no)
-            .filter(
-                ContractRecordRow.annex_no.is_(annex_no)
-                if annex_no is None
-                else (ContractRecordRow.annex_no == annex_no)
+        )
+        return [dict(zip(_CONTRACT_KEYS, r)) for r in q]
+
+
+def _search_contracts(*, year: int, q: str | None = None, limit: int | None = None, offset: int = 0) -> list[dict]:
+    """Main contracts (no annex) of a year for pickers/autocomplete, filtered and paged in SQL."""
+    if not _db_available():
+        return []
+
+    ql = (q or "").lower()
+    # SQLite's lower() only folds ASCII, so non-ASCII searches are matched in Python instead.
+    filter_in_sql = ql.isascii()
+    with session_scope() as db:
+        query = (
+            db.query(
+                ContractRecordRow.contract_no,
+                ContractRecordRow.kenh_ten,
+                ContractRecordRow.don_vi_ten,
+                ContractRecordRow.kenh_id,
             )
-            .first()
+            .filter(ContractRecordRow.contract_year == year)
+            .filter(or_(ContractRecordRow.annex_no.is_(None), ContractRecordRow.annex_no == ""))
+            .order_by(ContractRecordRow.id)
         )
+        if filter_in_sql:
+            if ql:
+                query = query.filter(
+                    or_(
+                        func.lower(ContractRecordRow.contract_no).contains(ql, autoescape=True),
+                        func.lower(ContractRecordRow.kenh_ten).contains(ql, autoescape=True),
+                    )
+                )
+            if offset:
+                query = query.offset(offset)
+            if limit is not None:
+                query = query.limit(limit)
+        rows = [r._asdict() for r in query]
+
+    if not filter_in_sql:
+        rows = [
+            r
+            for r in rows
+            if ql in (r.get("contract_no") or "").lower() or ql in (r.get("kenh_ten") or "").lower()
+        ]
+        rows = rows[offset : None if limit is None else offset + limit]
+    return rows
 
 
+def _db_get_contract_row(*, year: int, contract_no: str, annex_no: str | None) -> ContractRecordRow | None:
+    with session_scope() as db:
+        return _contract_row_query(db, year=year, contract_no=contract_no, annex_no=annex_no).first()
+
+
+@retry_db_operation
 def _db_upsert_contract_record(*, record: dict) -> None:
     year = int(record.get("contract_year") or 0)
     contract_no = str(record.get("contract_no") or "")
@@ -104,83 +236,80 @@ def _db_upsert_contract_record(*, record: dict) -> None:
     annex_no = (str(annex_no).strip() if annex_no is not None else None) or None
 
     with session_scope() as db:
-        q = (
-            db.query(ContractRecordRow)
-            .filter(ContractRecordRow.contract_year == year)
-            .filter(ContractRecordRow.contract_no == contract_no)
-        )
-        if annex_no is None:
-            q = q.filter(ContractRecordRow.annex_no.is_(None))
-        else:
-            q = q.filter(ContractRecordRow.annex_no == annex_no)
-
-        row = q.first()
+        row = _contract_row_query(db, year=year, contract_no=contract_no, annex_no=annex_no).first()
         if row is None:
             row = ContractRecordRow(contract_year=year, contract_no=contract_no, annex_no=annex_no)
             db.add(row)
 
-        for k, v in record.items():
-            if k in ("so_CCCD", "ngay_cap_CCCD"):
+        _apply_contract_fields(row, record)
+
+    _invalidate_rows_cache()
+
+
+def _db_insert_contract_records(records: Iterable[dict], *, chunk_size: int = 500) -> int:
+    """Bulk-insert new contract/annex records; keys already in the DB (or repeated in the batch) are skipped."""
+    # Materialise first: a retried attempt must see the same records, not an exhausted generator.
+    return _insert_contract_records(list(records), chunk_size=chunk_size)
+
+
+@retry_db_operation
+def _insert_contract_records(records: Sequence[dict], *, chunk_size: int) -> int:
+    pending: list[ContractRecordRow] = []
+    with session_scope() as db:
+        seen = set(db.query(ContractRecordRow.contract_year, ContractRecordRow.contract_no, ContractRecordRow.annex_no).all())
+        for record in records:
+            row = ContractRecordRow()
+            _apply_contract_fields(row, record)
+            row.annex_no = (str(row.annex_no).strip() if row.annex_no is not None else None) or None
+            if not row.contract_no or not row.contract_year:
                 continue
-            if hasattr(row, k):
-                setattr(row, k, v)
 
-        if "so_CCCD" in record:
-            row.so_cccd = record.get("so_CCCD")
-        if "ngay_cap_CCCD" in record:
-            row.ngay_cap_cccd = record.get("ngay_cap_CCCD")
+            key = (row.contract_year, row.contract_no, row.annex_no)
+            if key in seen:
+                continue
+            seen.add(key)
+            pending.append(row)
+
+        for i in range(0, len(pending), chunk_size):
+            db.add_all(pending[i : i + chunk_size])
+            db.flush()
 
+    if pending:
+        _invalidate_rows_cache()
+    return len(pending)
 
+
+@retry_db_operation
 def _db_update_contract_fields(*, year: int, contract_no: str, annex_no: str | None, updated: dict) -> bool:
     annex_no = (annex_no.strip() if isinstance(annex_no, str) else annex_no) or None
 
-    with session_scope() as db:
-        q = (
-            db.query(ContractRecordRow)
-            .filter(ContractRecordRow.contract_year == year)
-            .filter(ContractRecordRow.contract_no == contract_no)
-        )
-        if annex_no is None:
-            q = q.filter(ContractRecordRow.annex_no.is_(None))
-        else:
-            q = q.filter(ContractRecordRow.annex_no == annex_no)
-
-        row = q.first()
-        if row is None:
-            return False
+    values = {_CONTRACT_KEY_TO_ATTR[k]: v for k, v in updated.items() if k in _CONTRACT_KEY_TO_ATTR}
 
-        for k, v in updated.items():
-            if k in ("so_CCCD", "ngay_cap_CCCD"):
-                continue
-            if hasattr(row, k):
-                setattr(row, k, v)
+    with session_scope() as db:
+        q = _contract_row_query(db, year=year, contract_no=contract_no, annex_no=annex_no)
+        if not values:
+            return q.first() is not None
 
-        if "so_CCCD" in updated:
-            row.so_cccd = updated.get("so_CCCD")
-        if "ngay_cap_CCCD" in updated:
-            row.ngay_cap_cccd = updated.get("ngay_cap_CCCD")
+        # One UPDATE ... WHERE statement; the matched row count doubles as the existence check.
+        matched = q.update(values, synchronize_session=False)
 
-        return True
+    if not matched:
+        return False
+    _invalidate_rows_cache()
+    return True
 
 
+@retry_db_operation
 def _db_delete_contract_record(*, year: int, contract_no: str, annex_no: str | None) -> bool:
     annex_no = (annex_no.strip() if isinstance(annex_no, str) else annex_no) or None
     with session_scope() as db:
-        q = (
-            db.query(ContractRecordRow)
-            .filter(ContractRecordRow.contract_year == year)
-            .filter(ContractRecordRow.contract_no == contract_no)
-        )
-        if annex_no is None:
-            q = q.filter(ContractRecordRow.annex_no.is_(None))
-        else:
-            q = q.filter(ContractRecordRow.annex_no == annex_no)
-
-        row = q.first()
+        row = _contract_row_query(db, year=year, contract_no=contract_no, annex_no=annex_no).first()
         if row is None:
             return False
         db.delete(row)
-        return True
+
+    _invalidate_rows_cache()
+    return True
 
 
 def _xlsx_bytes_from_rows(*, sheet_name: str, headers: list[str], rows: list[dict]) -> bytes:
@@ -204,86 +333,16 @@ def _xlsx_bytes_from_rows(*, sheet_name: str, headers: list[str], rows: list[dic
 
 def _export_contracts_excel_bytes(*, year: int) -> bytes:
     with session_scope() as db:
-        q = db.query(ContractRecordRow).filter(ContractRecordRow.contract_year == year)
-        db_rows = q.all()
-
-    rows: list[dict] = []
-    for r in db_rows:
-        rows.append(
-            {
-                "contract_no": r.contract_no,
-                "contract_year": r.contract_year,
-                "annex_no": r.annex_no,
-                "ngay_lap_hop_dong": r.ngay_lap_hop_dong,
-                "linh_vuc": r.linh_vuc,
-                "region_code": r.region_code,
-                "field_code": r.field_code,
-                "don_vi_ten": r.don_vi_ten,
-                "don_vi_dia_chi": r.don_vi_dia_chi,
-                "don_vi_dien_thoai": r.don_vi_dien_thoai,
-                "don_vi_nguoi_dai_dien": r.don_vi_nguoi_dai_dien,
-                "don_vi_chuc_vu": r.don_vi_chuc_vu,
-                "don_vi_mst": r.don_vi_mst,
-                "don_vi_email": r.don_vi_email,
-                "so_CCCD": r.so_cccd,
-                "ngay_cap_CCCD": r.ngay_cap_cccd,
-                "kenh_ten": r.kenh_ten,
-                "kenh_id": r.kenh_id,
-                "nguoi_thuc_hien_email": r.nguoi_thuc_hien_email,
-                "so_tien_nhuan_but_value": r.so_tien_nhuan_but_value,
-                "so_tien_nhuan_but_text": r.so_tien_nhuan_but_text,
-                "so_tien_chua_GTGT_value": r.so_tien_chua_gtgt_value,
-                "so_tien_chua_GTGT_text": r.so_tien_chua_gtgt_text,
-                "thue_percent": r.thue_percent,
-                "thue_GTGT_value": r.thue_gtgt_value,
-                "thue_GTGT_text": r.thue_gtgt_text,
-                "so_tien_value": r.so_tien_value,
-                "so_tien_text": r.so_tien_text,
-                "so_tien_bang_chu": r.so_tien_bang_chu,
-                "docx_path": r.docx_path,
-                "catalogue_path": r.catalogue_path,
-            }
-        )
+        q = db.query(*_CONTRACT_COLUMNS).filter(ContractRecordRow.contract_year == year)
+        rows = [dict(zip(_CONTRACT_KEYS, r)) for r in q]
 
     return _xlsx_bytes_from_rows(sheet_name="Contracts", headers=list(HEADERS), rows=rows)
 
 
 def _export_works_excel_bytes(*, year: int) -> bytes:
     with session_scope() as db:
-        q = db.query(WorkRow).filter(WorkRow.year == year)
-        db_rows = q.all()
-
-    rows: list[dict] = []
-    for r in db_rows:
-        rows.append(
-            {
-                "year": r.year,
-                "contract_no": r.contract_no,
-                "annex_no": r.annex_no,
-                "ngay_ky_hop_dong": r.ngay_ky_hop_dong,
-                "ngay_ky_phu_luc": r.ngay_ky_phu_luc,
-                "nguoi_thuc_hien": r.nguoi_thuc_hien,
-                "ten_kenh": r.ten_kenh,
-                "id_channel": r.id_channel,
-                "link_kenh": r.link_kenh,
-                "stt": r.stt,
-                "id_link": r.id_link,
-                "youtube_url": r.youtube_url,
-                "id_work": r.id_work,
-                "musical_work": r.musical_work,
-                "author": r.author,
-                "composer": r.composer,
-                "lyricist": r.lyricist,
-                "time_range": r.time_range,
-                "duration": r.duration,
-                "effective_date": r.effective_date,
-                "expiration_date": r.expiration_date,
-                "usage_type": r.usage_type,
-                "royalty_rate": r.royalty_rate,
-                "note": r.note,
-                "imported_at": r.imported_at,
-            }
-        )
+        q = db.query(*_WORKS_COLUMNS).filter(WorkRow.year == year)
+        rows = [dict(zip(_WORKS_FIELDS, r)) for r in q]
 
     return _xlsx_bytes_from_rows(sheet_name="Works", headers=list(WORKS_HEADERS), rows=rows)
 
@@ -1,12 +1,14 @@
 from __future__ import annotations
 
+import json
+import logging
 import re
 from datetime import date, datetime
+from logging.handlers import TimedRotatingFileHandler
 from pathlib import Path
 from urllib.parse import quote
 
 from fastapi import Depends, FastAPI, File, Form, HTTPException, Request, UploadFile, Response
-from fastapi.encoders import jsonable_encoder
 from starlette import status
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from fastapi.staticfiles import StaticFiles
@@ -24,7 +26,7 @@ from app.config import (
 
 from app.db import DB_PATH, engine
 from app.db_models import Base, UserRow
-from app.auth import ensure_default_users, get_current_user, get_permissions_for_user, require_role
+from app.auth import ensure_default_users, get_current_user, get_request_permissions, require_role
 from app.db_ops import (
     _db_available,
     _rows_from_db,
@@ -77,21 +79,49 @@ async def _http_exception_handler(request: Request, exc: HTTPException):
     return JSONResponse({"success": False, "error": exc.detail}, status_code=exc.status_code)
 
 
+def _setup_app_logging() -> None:
+    # One persistent handle on storage/logs/app.log, rotated at midnight, for every "app.*" logger
+    logger = logging.getLogger("app")
+    if any(isinstance(h, TimedRotatingFileHandler) for h in logger.handlers):
+        return
+    _LOGS_DIR.mkdir(parents=True, exist_ok=True)
+    handler = TimedRotatingFileHandler(_LOGS_DIR / "app.log", when="midnight", backupCount=30, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    logger.addHandler(handler)
+
+
 @app.on_event("startup")
 def _startup_db() -> None:
     # Ensure SQLite schema exists
     Base.metadata.create_all(bind=engine)
     ensure_default_users()
+    _setup_app_logging()
 
 
 _BACKUPS_DIR = STORAGE_DIR / "backups"
 _LOGS_DIR = STORAGE_DIR / "logs"
 
 
+# Row dicts hold only JSON primitives plus dates, so an exact-type lookup is all
+# json.dumps needs; no generic recursive encoder pass over the payload.
+_JSON_CONVERTERS = {
+    date: date.isoformat,
+    datetime: datetime.isoformat,
+}
+
+
+def _json_default(obj):
+    conv = _JSON_CONVERTERS.get(type(obj))
+    if conv is None:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return conv(obj)
+
+
 @app.get("/debug/contracts")
 def debug_contracts(year: int | None = None):
     y = _pick_year(year)
-    rows = _rows_from_db(year=y) if _db_available() else []
+    db_exists = _db_available()
+    rows = _rows_from_db(year=y) if db_exists else []
     contracts = [r for r in rows if not r.get("annex_no")]
     annexes = [r for r in rows if r.get("annex_no")]
     sample = contracts[0] if contracts else (rows[0] if rows else None)
@@ -99,14 +129,17 @@ def debug_contracts(year: int | None = None):
     payload = {
         "year": y,
         "db_path": str(DB_PATH),
-        "db_exists": _db_available(),
+        "db_exists": db_exists,
         "rows": len(rows),
         "contracts": len(contracts),
         "annexes": len(annexes),
         "sample": sample,
         "annex_sample": annex_sample,
     }
-    return JSONResponse(jsonable_encoder(payload))
+    return Response(
+        content=json.dumps(payload, default=_json_default, ensure_ascii=False),
+        media_type="application/json",
+    )
 
 
 def _pick_year(year: int | None) -> int:
@@ -180,12 +213,8 @@ def _template_has_permission(request: Request, permission: str) -> bool:
     if not p:
         return False
     try:
-        cached = getattr(request.state, "_perms_cache", None)
-        if cached is None:
-            user = get_current_user(request)
-            cached = get_permissions_for_user(user=user)
-            request.state._perms_cache = cached
-        return p in cached
+        perms = get_request_permissions(request, user=get_current_user(request))
+        return p in perms
     except Exception:
         return False
 
@@ -4,6 +4,8 @@ from datetime import date
 from typing import Optional
 from pydantic import BaseModel, Field
 
+from app.context import DEFAULT_CHUC_VU
+
 
 class ContractCreate(BaseModel):
     ngay_lap_hop_dong: date
@@ -15,7 +17,7 @@ class ContractCreate(BaseModel):
     don_vi_dia_chi: Optional[str] = None
     don_vi_dien_thoai: Optional[str] = None
     don_vi_nguoi_dai_dien: Optional[str] = None
-    don_vi_chuc_vu: Optional[str] = "Giám đốc"
+    don_vi_chuc_vu: Optional[str] = DEFAULT_CHUC_VU
     don_vi_mst: Optional[str] = None
     don_vi_email: Optional[str] = None
 
@@ -1,5 +1,8 @@
 from __future__ import annotations
 
+import os
+from pathlib import Path
+
 from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import FileResponse, HTMLResponse
 from starlette import status
@@ -13,6 +16,30 @@ from app.utils import get_breadcrumbs
 router = APIRouter()
 
 
+def _list_files(base: Path) -> list[dict]:
+    # scandir entries cache their stat() result, so each file is stat'ed once.
+    out: list[dict] = []
+    stack = [str(base)]
+    while stack:
+        current = stack.pop()
+        try:
+            it = os.scandir(current)
+        except OSError:
+            continue
+        with it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        name = os.path.relpath(entry.path, base).replace("\\", "/")
+                        out.append({"name": name, "size": entry.stat().st_size})
+                except OSError:
+                    continue
+    out.sort(key=lambda x: x["name"])
+    return out
+
+
 @router.get("/admin/ops", response_class=HTMLResponse)
 def admin_ops(request: Request, user: UserRow = Depends(require_permission("admin.ops.view"))):
     templates = request.app.state.templates
@@ -20,18 +47,8 @@ def admin_ops(request: Request, user: UserRow = Depends(require_permission("admi
     logs_dir = STORAGE_DIR / "logs"
     backups_dir = STORAGE_DIR / "backups"
 
-    logs: list[dict] = []
-    backups: list[dict] = []
-
-    if logs_dir.exists():
-        for p in sorted(logs_dir.glob("**/*")):
-            if p.is_file():
-                logs.append({"name": str(p.relative_to(logs_dir)).replace("\\", "/"), "size": p.stat().st_size})
-
-    if backups_dir.exists():
-        for p in sorted(backups_dir.glob("**/*")):
-            if p.is_file():
-                backups.append({"name": str(p.relative_to(backups_dir)).replace("\\", "/"), "size": p.stat().st_size})
+    logs = _list_files(logs_dir) if logs_dir.exists() else []
+    backups = _list_files(backups_dir) if backups_dir.exists() else []
 
     return templates.TemplateResponse(
         "admin_ops.html",
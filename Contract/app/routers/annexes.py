@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from datetime import date, datetime
 from pathlib import Path
 
@@ -7,7 +8,7 @@ from fastapi import APIRouter, Depends, Form, Request, Response
 from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 
 from app.auth import require_permission
-from app.context import FIELD_CODE, FIELD_NAME, REGION_CODE
+from app.context import DEFAULT_CHUC_VU, FIELD_CODE, FIELD_NAME, REGION_CODE
 from app.config import ANNEX_CATALOGUE_TEMPLATE_PATH, ANNEX_TEMPLATE_PATH, STORAGE_DIR, STORAGE_DOCX_DIR, STORAGE_EXCEL_DIR
 from app.db_models import UserRow
 from app.db_ops import _db_delete_contract_record, _db_get_contract_row, _db_upsert_contract_record, _rows_from_db
@@ -18,9 +19,11 @@ from app.services.excel_store import export_catalogue_excel
 from app.services.safety import audit_log, safe_move_to_backup
 from app.utils import (
     clean_opt as _clean_opt,
+    format_error_message,
     format_money_number,
     format_money_vnd,
     get_breadcrumbs,
+    log_route_error,
     money_to_vietnamese_words,
     normalize_money_to_int,
     normalize_multi_emails,
@@ -29,6 +32,8 @@ from app.utils import (
 )
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 _BACKUPS_DIR = STORAGE_DIR / "backups"
@@ -156,11 +161,8 @@ def create_annex(
         nguoi_thuc_hien_email = actor_email
         so_phu_luc = annex_no.strip() or None
 
-        parts = contract_no.split("/")
-        if len(parts) >= 2 and parts[1].isdigit():
-            year = int(parts[1])
-        else:
-            year = date.today().year
+        year_part = contract_no.partition("/")[2].partition("/")[0]
+        year = int(year_part) if year_part.isdigit() else date.today().year
 
         contracts = _rows_from_db(year=year)
 
@@ -240,7 +242,7 @@ def create_annex(
             _clean_opt(don_vi_dien_thoai) or (contract_row.get("don_vi_dien_thoai") if contract_row else "") or ""
         )
         don_vi_nguoi_dai_dien_value = _clean_opt(don_vi_nguoi_dai_dien) or (contract_row.get("don_vi_nguoi_dai_dien") if contract_row else "") or ""
-        don_vi_chuc_vu_value = _clean_opt(don_vi_chuc_vu) or (contract_row.get("don_vi_chuc_vu") if contract_row else "") or "Giám đốc"
+        don_vi_chuc_vu_value = _clean_opt(don_vi_chuc_vu) or (contract_row.get("don_vi_chuc_vu") if contract_row else "") or DEFAULT_CHUC_VU
         don_vi_mst_value = _clean_opt(don_vi_mst) or (contract_row.get("don_vi_mst") if contract_row else "") or ""
         don_vi_email_value = normalize_multi_emails(_clean_opt(don_vi_email) or (contract_row.get("don_vi_email") if contract_row else "") or "")
         kenh_ten_value = _clean_opt(kenh_ten) or (contract_row.get("kenh_ten") if contract_row else "") or ""
@@ -335,10 +337,12 @@ def create_annex(
         catalogue_name = out_docx_path.with_suffix(".xlsx").name
         out_catalogue_path = out_excel_dir / catalogue_name
 
-        catalogue_context = dict(context)
-        catalogue_context["so_hop_dong_day_du"] = contract_no
-        catalogue_context["ngay_ky_hop_dong"] = contract_date.strftime("%d/%m/%Y")
-        catalogue_context["ngay_ky_phu_luc"] = annex_date.strftime("%d/%m/%Y")
+        catalogue_context = {
+            **context,
+            "so_hop_dong_day_du": contract_no,
+            "ngay_ky_hop_dong": contract_date.strftime("%d/%m/%Y"),
+            "ngay_ky_phu_luc": annex_date.strftime("%d/%m/%Y"),
+        }
         export_catalogue_excel(
             template_path=ANNEX_CATALOGUE_TEMPLATE_PATH,
             output_path=out_catalogue_path,
@@ -346,11 +350,6 @@ def create_annex(
             sheet_name="Final",
         )
 
-        vat_percent_final = None
-        if _clean_opt(so_tien_chua_GTGT):
-            pct_raw = _clean_opt(thue_percent) or "10"
-            vat_percent_final = float(pct_raw.replace(",", "."))
-
         annex_record = ContractRecord(
             contract_no=contract_no,
             contract_year=year,
@@ -372,7 +371,7 @@ def create_annex(
             so_tien_nhuan_but_text=format_money_vnd(total_value) if total_value else None,
             so_tien_chua_GTGT_value=pre_vat_value if pre_vat_value else None,
             so_tien_chua_GTGT_text=format_money_vnd(pre_vat_value) if pre_vat_value else None,
-            thue_percent=vat_percent_final,
+            thue_percent=vat_percent_value,
             thue_GTGT_value=vat_value if vat_value else None,
             thue_GTGT_text=format_money_vnd(vat_value) if vat_value else None,
             so_tien_value=total_value if total_value else None,
@@ -381,7 +380,7 @@ def create_annex(
             docx_path=str(out_docx_path),
             catalogue_path=str(out_catalogue_path),
         )
-        _db_upsert_contract_record(record=annex_record.dict())
+        _db_upsert_contract_record(record=annex_record.model_dump())
 
         audit_log(
             log_dir=_LOGS_DIR,
@@ -406,7 +405,9 @@ def create_annex(
             status_code=303,
         )
     except Exception as e:
-        return RedirectResponse(url=f"/documents/new?doc_type=annex&error={str(e)}", status_code=303)
+        log_route_error(logger, "create_annex failed for contract %s annex %s", contract_no, annex_no)
+        msg = format_error_message(e)
+        return RedirectResponse(url=f"/documents/new?doc_type=annex&error={msg}", status_code=303)
 
 
 @router.post("/annexes/{year}/delete")
@@ -444,9 +445,10 @@ def delete_annex(
             return JSONResponse({"success": True})
         return JSONResponse({"success": False, "error": "Không tìm thấy phụ lục"}, status_code=404)
     except Exception as e:
-        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+        log_route_error(logger, "delete_annex failed for %s/%s annex %s", year, contract_no, annex_no)
+        return JSONResponse({"success": False, "error": format_error_message(e)}, status_code=500)
 
 
 def _parse_so_hop_dong_4(contract_no: str) -> str:
     # Usually first segment in format "0001/2025/HĐQTGAN-PN/MR"
-    return (contract_no or "").split("/")[0].strip()
+    return (contract_no or "").partition("/")[0].strip()
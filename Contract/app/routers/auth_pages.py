@@ -1,11 +1,15 @@
 from __future__ import annotations
 
+import logging
+
 from fastapi import APIRouter, Form, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 
 from app.auth import verify_username_password
-from app.utils import get_breadcrumbs
+from app.utils import format_error_message, get_breadcrumbs, log_route_error
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -49,7 +53,8 @@ def login_submit(
             return RedirectResponse(url=target, status_code=303)
         return RedirectResponse(url="/dashboard", status_code=303)
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "login failed for %s", username)
+        msg = format_error_message(e)
         q_next = (next or "").strip()
         url = f"/login?error={msg}"
         if q_next:
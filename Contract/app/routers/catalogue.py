@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 from pathlib import Path
 
 from fastapi import APIRouter, Depends, File, Form, Request, UploadFile
@@ -10,9 +11,11 @@ from app.config import STORAGE_DIR, STORAGE_EXCEL_DIR
 from app.db_models import UserRow
 from app.db_ops import _db_get_contract_row, _db_update_contract_fields
 from app.services.safety import audit_log, safe_replace_bytes
-from app.utils import get_breadcrumbs
+from app.utils import format_error_message, get_breadcrumbs, log_route_error
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -103,16 +106,18 @@ async def catalogue_upload_submit(
         sep = "&" if "?" in redirect_to else "?"
         return RedirectResponse(url=f"{redirect_to}{sep}message=Đã upload danh mục và cập nhật dữ liệu", status_code=303)
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "catalogue upload failed for %s/%s annex %s", year, contract_no, annex_no)
+        msg = format_error_message(e)
         redirect_to = (next or "").strip() or f"/catalogue/upload?year={year}&contract_no={contract_no}&annex_no={annex_no}"
         sep = "&" if "?" in redirect_to else "?"
         return RedirectResponse(url=f"{redirect_to}{sep}error={msg}", status_code=303)
 
 
 def _year_from_contract_no(contract_no: str) -> int:
-    parts = (contract_no or "").split("/")
-    if len(parts) >= 2 and parts[1].isdigit():
-        return int(parts[1])
+    # Second "/"-separated segment, without splitting the whole string
+    year_part = (contract_no or "").partition("/")[2].partition("/")[0]
+    if year_part.isdigit():
+        return int(year_part)
     from datetime import date
 
     return date.today().year
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import logging
+from collections import Counter
 from datetime import date
 from io import BytesIO
 from pathlib import Path
@@ -10,7 +12,7 @@ from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse
 from starlette import status
 
 from app.auth import require_permission
-from app.context import FIELD_CODE, FIELD_NAME, REGION_CODE
+from app.context import DEFAULT_CHUC_VU, FIELD_CODE, FIELD_NAME, REGION_CODE
 from app.db_models import UserRow
 from app.db_ops import (
     _db_available,
@@ -19,7 +21,9 @@ from app.db_ops import (
     _db_update_contract_fields,
     _db_upsert_contract_record,
     _pick_latest_contract_year,
+    _rows_for_contract,
     _rows_from_db,
+    _search_contracts,
 )
 from app.documents.naming import build_docx_filename
 from app.services.docx_renderer import date_parts, render_contract_docx
@@ -28,8 +32,10 @@ from app.services.safety import audit_log, safe_move_to_backup
 from app.config import CATALOGUE_TEMPLATE_PATH, DOCX_TEMPLATE_PATH, STORAGE_DIR, STORAGE_DOCX_DIR, STORAGE_EXCEL_DIR
 from app.utils import (
     clean_opt as _clean_opt,
+    format_error_message,
     format_money_number,
     get_breadcrumbs,
+    log_route_error,
     money_to_vietnamese_words,
     normalize_money_to_int,
     normalize_multi_emails,
@@ -38,6 +44,8 @@ from app.utils import (
 )
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 _BACKUPS_DIR = STORAGE_DIR / "backups"
@@ -50,7 +58,7 @@ def contract_form() -> RedirectResponse:
 
 
 @router.get("/api/contracts")
-def api_contracts_list(year: str | None = None, q: str | None = None):
+def api_contracts_list(year: str | None = None, q: str | None = None, limit: int | None = None, offset: int = 0):
     year_int: int | None = None
     try:
         yraw = (year or "").strip()
@@ -59,25 +67,9 @@ def api_contracts_list(year: str | None = None, q: str | None = None):
         year_int = None
 
     y = year_int or (_pick_latest_contract_year(date.today().year) if _db_available() else date.today().year)
-    rows = _rows_from_db(year=y)
-    contracts = [r for r in rows if not r.get("annex_no")]
-    if q:
-        ql = q.lower()
-        contracts = [
-            c
-            for c in contracts
-            if ql in (c.get("contract_no") or "").lower() or ql in (c.get("kenh_ten") or "").lower()
-        ]
-    result = []
-    for c in contracts:
-        result.append(
-            {
-                "contract_no": c.get("contract_no"),
-                "kenh_ten": c.get("kenh_ten"),
-                "don_vi_ten": c.get("don_vi_ten"),
-                "kenh_id": c.get("kenh_id"),
-            }
-        )
+    # Filtering and optional paging run in SQL; without a limit the full list is returned as before.
+    limit = max(limit, 0) if limit is not None else None
+    result = _search_contracts(year=y, q=q, limit=limit, offset=max(offset, 0))
     return JSONResponse({"contracts": result})
 
 
@@ -116,9 +108,9 @@ def contracts_list(
         contracts = [r for r in contracts if not r.get("catalogue_path")]
 
     annexes = [r for r in rows if r.get("annex_no")]
+    annex_counts = Counter(a.get("contract_no") for a in annexes)
     for r in contracts:
-        contract_no = r.get("contract_no")
-        r["annex_count"] = len([a for a in annexes if a.get("contract_no") == contract_no])
+        r["annex_count"] = annex_counts[r.get("contract_no")]
 
         p = Path(r.get("docx_path") or "")
         r["download_url"] = f"/download/{y}/{p.name}" if p.exists() else None
@@ -160,7 +152,7 @@ def create_contract(
     don_vi_dia_chi: str = Form(""),
     don_vi_dien_thoai: str = Form(""),
     don_vi_nguoi_dai_dien: str = Form(""),
-    don_vi_chuc_vu: str = Form("Giám đốc"),
+    don_vi_chuc_vu: str = Form(DEFAULT_CHUC_VU),
     don_vi_mst: str = Form(""),
     don_vi_email: str = Form(""),
     so_CCCD: str = Form(""),
@@ -195,7 +187,8 @@ def create_contract(
             user=user,
         )
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "create_contract failed for so_hop_dong_4=%s", so_hop_dong_4)
+        msg = format_error_message(e)
         return RedirectResponse(url=f"/documents/new?doc_type=contract&error={msg}", status_code=303)
 
 
@@ -237,6 +230,15 @@ def _create_contract_impl(
         vat_value = int(round(pre_vat_value * vat_percent_value / 100.0))
         total_value = pre_vat_value + vat_value
 
+    # Each derived value is used by the DOCX context, the catalogue and the DB record; compute once.
+    pre_vat_text = format_money_number(pre_vat_value) if pre_vat_value else ""
+    vat_text = format_money_number(vat_value) if vat_value else ""
+    total_text = format_money_number(total_value) if total_value else ""
+    total_words = money_to_vietnamese_words(total_value) if total_value else ""
+    phones = normalize_multi_phones(don_vi_dien_thoai)
+    emails = normalize_multi_emails(don_vi_email)
+    chuc_vu = _clean_opt(don_vi_chuc_vu) or DEFAULT_CHUC_VU
+
     contract_date = date.fromisoformat(ngay_lap_hop_dong)
     year = contract_date.year
     contract_no = f"{so_hop_dong_4}/{year}/{REGION_CODE}/{FIELD_CODE}"
@@ -269,35 +271,35 @@ def _create_contract_impl(
         "nam_ky_hop_dong": f"{contract_date.year}",
         "don_vi_ten": _clean_opt(don_vi_ten),
         "don_vi_dia_chi": _clean_opt(don_vi_dia_chi),
-        "don_vi_dien_thoai": normalize_multi_phones(don_vi_dien_thoai),
+        "don_vi_dien_thoai": phones,
         "don_vi_nguoi_dai_dien": _clean_opt(don_vi_nguoi_dai_dien),
-        "don_vi_chuc_vu": _clean_opt(don_vi_chuc_vu) or "Giám đốc",
+        "don_vi_chuc_vu": chuc_vu,
         "don_vi_mst": _clean_opt(don_vi_mst),
-        "don_vi_email": normalize_multi_emails(don_vi_email),
+        "don_vi_email": emails,
         "so_CCCD": _clean_opt(so_CCCD),
         "ngay_cap_CCCD": _clean_opt(ngay_cap_CCCD),
         "kenh_ten": _clean_opt(kenh_ten),
         "kenh_id": channel_id,
         "link_kenh": channel_link,
         "nguoi_thuc_hien_email": actor_email,
-        "so_tien_chua_GTGT": format_money_number(pre_vat_value) if pre_vat_value else "",
-        "thue_GTGT": format_money_number(vat_value) if vat_value else "",
-        "so_tien_GTGT": format_money_number(total_value) if total_value else "",
-        "so_tien": format_money_number(total_value) if total_value else "",
-        "so_tien_bang_chu": money_to_vietnamese_words(total_value) if total_value else "",
+        "so_tien_chua_GTGT": pre_vat_text,
+        "thue_GTGT": vat_text,
+        "so_tien_GTGT": total_text,
+        "so_tien": total_text,
+        "so_tien_bang_chu": total_words,
         "thue_percent": str(int(vat_percent_value)) if vat_percent_value else "10",
 
         # Legacy/template-friendly aliases
         "TEN_DON_VI": _clean_opt(don_vi_ten),
         "ten_don_vi": _clean_opt(don_vi_ten),
         "dia_chi": _clean_opt(don_vi_dia_chi),
-        "so_dien_thoai": normalize_multi_phones(don_vi_dien_thoai),
+        "so_dien_thoai": phones,
         "NGUOI_DAI_DIEN": _clean_opt(don_vi_nguoi_dai_dien),
         "nguoi_dai_dien": _clean_opt(don_vi_nguoi_dai_dien),
-        "CHUC_VU": (_clean_opt(don_vi_chuc_vu) or "Giám đốc"),
-        "chuc_vu": (_clean_opt(don_vi_chuc_vu) or "Giám đốc"),
+        "CHUC_VU": chuc_vu,
+        "chuc_vu": chuc_vu,
         "ma_so_thue": _clean_opt(don_vi_mst),
-        "email": normalize_multi_emails(don_vi_email),
+        "email": emails,
         "ten_kenh": _clean_opt(kenh_ten),
     }
 
@@ -307,9 +309,11 @@ def _create_contract_impl(
     out_excel_dir.mkdir(parents=True, exist_ok=True)
     out_catalogue_path = out_excel_dir / out_docx_path.with_suffix(".xlsx").name
 
-    catalogue_context = dict(context)
-    catalogue_context["so_hop_dong_day_du"] = contract_no
-    catalogue_context["ngay_ky_hop_dong"] = contract_date.strftime("%d/%m/%Y")
+    catalogue_context = {
+        **context,
+        "so_hop_dong_day_du": contract_no,
+        "ngay_ky_hop_dong": contract_date.strftime("%d/%m/%Y"),
+    }
     export_catalogue_excel(
         template_path=CATALOGUE_TEMPLATE_PATH,
         output_path=out_catalogue_path,
@@ -328,24 +332,24 @@ def _create_contract_impl(
             "field_code": FIELD_CODE,
             "don_vi_ten": _clean_opt(don_vi_ten),
             "don_vi_dia_chi": _clean_opt(don_vi_dia_chi),
-            "don_vi_dien_thoai": normalize_multi_phones(don_vi_dien_thoai),
+            "don_vi_dien_thoai": phones,
             "don_vi_nguoi_dai_dien": _clean_opt(don_vi_nguoi_dai_dien),
-            "don_vi_chuc_vu": _clean_opt(don_vi_chuc_vu) or "Giám đốc",
+            "don_vi_chuc_vu": chuc_vu,
             "don_vi_mst": _clean_opt(don_vi_mst),
-            "don_vi_email": normalize_multi_emails(don_vi_email),
+            "don_vi_email": emails,
             "so_CCCD": _clean_opt(so_CCCD),
             "ngay_cap_CCCD": _clean_opt(ngay_cap_CCCD),
             "kenh_ten": _clean_opt(kenh_ten),
             "kenh_id": channel_id,
             "nguoi_thuc_hien_email": actor_email,
             "so_tien_chua_GTGT_value": pre_vat_value,
-            "so_tien_chua_GTGT_text": format_money_number(pre_vat_value) if pre_vat_value else "",
+            "so_tien_chua_GTGT_text": pre_vat_text,
             "thue_percent": vat_percent_value,
             "thue_GTGT_value": vat_value,
-            "thue_GTGT_text": format_money_number(vat_value) if vat_value else "",
+            "thue_GTGT_text": vat_text,
             "so_tien_value": total_value,
-            "so_tien_text": format_money_number(total_value) if total_value else "",
-            "so_tien_bang_chu": money_to_vietnamese_words(total_value) if total_value else "",
+            "so_tien_text": total_text,
+            "so_tien_bang_chu": total_words,
             "docx_path": str(out_docx_path),
             "catalogue_path": str(out_catalogue_path),
         }
@@ -404,6 +408,7 @@ def update_contract(
             vat_value = int(round(pre_vat_value * vat_percent_value / 100.0))
             total_value = pre_vat_value + vat_value
 
+        total_text = format_money_number(total_value) if total_value else ""
         channel_id, _ = normalize_youtube_channel_input(kenh_id)
 
         updated_data = {
@@ -423,9 +428,9 @@ def update_contract(
             "thue_GTGT_value": vat_value,
             "thue_GTGT_text": format_money_number(vat_value) if vat_value else "",
             "so_tien_value": total_value,
-            "so_tien_text": format_money_number(total_value) if total_value else "",
+            "so_tien_text": total_text,
             "so_tien_nhuan_but_value": total_value,
-            "so_tien_nhuan_but_text": format_money_number(total_value) if total_value else "",
+            "so_tien_nhuan_but_text": total_text,
             "so_tien_bang_chu": money_to_vietnamese_words(total_value) if total_value else "",
         }
 
@@ -449,19 +454,22 @@ def update_contract(
         return RedirectResponse(url=f"/contracts?year={year}&error=Update failed", status_code=303)
 
     except Exception as e:
+        log_route_error(logger, "update_contract failed for %s/%s", year, contract_no)
         from urllib.parse import quote
 
-        return RedirectResponse(url=f"/contracts/{year}/edit?contract_no={quote(contract_no)}&error={str(e)}", status_code=303)
+        msg = format_error_message(e)
+        return RedirectResponse(url=f"/contracts/{year}/edit?contract_no={quote(contract_no)}&error={msg}", status_code=303)
 
 
 @router.get("/contracts/{year}/detail")
 def contract_detail(year: int, contract_no: str, user: UserRow = Depends(require_permission("contracts.read"))):
-    row = _db_get_contract_row(year=year, contract_no=contract_no, annex_no=None)
+    # The contract and its annexes share (year, contract_no), so one query returns all of them.
+    rows = _rows_for_contract(year=year, contract_no=contract_no)
+    row = next((r for r in rows if r.get("annex_no") is None), None)
     if row is None:
         return JSONResponse({"success": False, "error": "Không tìm thấy hợp đồng"}, status_code=404)
 
-    rows = _rows_from_db(year=year)
-    annexes = [r for r in rows if r.get("contract_no") == contract_no and r.get("annex_no")]
+    annexes = [r for r in rows if r.get("annex_no")]
     annex_items = []
     for a in annexes:
         annex_no = a.get("annex_no")
@@ -488,28 +496,28 @@ def contract_detail(year: int, contract_no: str, user: UserRow = Depends(require
         {
             "success": True,
             "contract": {
-                "contract_no": row.contract_no,
-                "contract_year": row.contract_year,
-                "annex_no": row.annex_no,
-                "ngay_lap_hop_dong": row.ngay_lap_hop_dong.isoformat() if row.ngay_lap_hop_dong else None,
-                "linh_vuc": row.linh_vuc,
-                "don_vi_ten": row.don_vi_ten,
-                "don_vi_dia_chi": row.don_vi_dia_chi,
-                "don_vi_dien_thoai": row.don_vi_dien_thoai,
-                "don_vi_nguoi_dai_dien": row.don_vi_nguoi_dai_dien,
-                "don_vi_chuc_vu": row.don_vi_chuc_vu,
-                "don_vi_mst": row.don_vi_mst,
-                "don_vi_email": row.don_vi_email,
-                "so_CCCD": row.so_cccd,
-                "ngay_cap_CCCD": row.ngay_cap_cccd,
-                "kenh_ten": row.kenh_ten,
-                "kenh_id": row.kenh_id,
-                "nguoi_thuc_hien_email": row.nguoi_thuc_hien_email,
-                "so_tien_value": row.so_tien_value,
-                "so_tien_text": row.so_tien_text,
-                "so_tien_bang_chu": row.so_tien_bang_chu,
-                "catalogue_path": row.catalogue_path,
-                "docx_path": row.docx_path,
+                "contract_no": row.get("contract_no"),
+                "contract_year": row.get("contract_year"),
+                "annex_no": row.get("annex_no"),
+                "ngay_lap_hop_dong": row["ngay_lap_hop_dong"].isoformat() if row.get("ngay_lap_hop_dong") else None,
+                "linh_vuc": row.get("linh_vuc"),
+                "don_vi_ten": row.get("don_vi_ten"),
+                "don_vi_dia_chi": row.get("don_vi_dia_chi"),
+                "don_vi_dien_thoai": row.get("don_vi_dien_thoai"),
+                "don_vi_nguoi_dai_dien": row.get("don_vi_nguoi_dai_dien"),
+                "don_vi_chuc_vu": row.get("don_vi_chuc_vu"),
+                "don_vi_mst": row.get("don_vi_mst"),
+                "don_vi_email": row.get("don_vi_email"),
+                "so_CCCD": row.get("so_CCCD"),
+                "ngay_cap_CCCD": row.get("ngay_cap_CCCD"),
+                "kenh_ten": row.get("kenh_ten"),
+                "kenh_id": row.get("kenh_id"),
+                "nguoi_thuc_hien_email": row.get("nguoi_thuc_hien_email"),
+                "so_tien_value": row.get("so_tien_value"),
+                "so_tien_text": row.get("so_tien_text"),
+                "so_tien_bang_chu": row.get("so_tien_bang_chu"),
+                "catalogue_path": row.get("catalogue_path"),
+                "docx_path": row.get("docx_path"),
             },
             "annexes": annex_items,
         }
@@ -549,4 +557,5 @@ def delete_contract(
             return JSONResponse({"success": True})
         return JSONResponse({"success": False, "error": "Không tìm thấy hợp đồng"}, status_code=404)
     except Exception as e:
-        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+        log_route_error(logger, "delete_contract failed for %s/%s", year, contract_no)
+        return JSONResponse({"success": False, "error": format_error_message(e)}, status_code=500)
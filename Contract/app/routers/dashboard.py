@@ -4,6 +4,7 @@ from datetime import date
 
 from fastapi import APIRouter, Depends, Request
 from fastapi.responses import HTMLResponse
+from sqlalchemy import func
 
 from app.auth import require_permission
 from app.db import session_scope
@@ -25,15 +26,22 @@ def dashboard_view(request: Request, user: UserRow = Depends(require_permission(
     year = today.year
 
     with session_scope() as db:
-        qc = db.query(ContractRecordRow).filter(ContractRecordRow.contract_year == year)
+        qc = db.query(
+            ContractRecordRow.annex_no,
+            ContractRecordRow.so_tien_value,
+            ContractRecordRow.kenh_ten,
+            ContractRecordRow.kenh_id,
+        ).filter(ContractRecordRow.contract_year == year)
         if owner_filter:
             qc = qc.filter(ContractRecordRow.nguoi_thuc_hien_email == owner_filter)
         c_rows = qc.all()
 
-        qw = db.query(WorkRow).filter(WorkRow.year == year)
+        # Plain count(*) on works.year is answered from ix_works_year; Query.count()
+        # would wrap a full-column SELECT in a subquery first.
+        qw = db.query(func.count(WorkRow.id)).filter(WorkRow.year == year)
         if owner_filter:
             qw = qw.filter(WorkRow.nguoi_thuc_hien == owner_filter)
-        w_count = qw.count()
+        w_count = qw.scalar()
 
     contracts = [r for r in c_rows if r.annex_no is None]
     annexes = [r for r in c_rows if r.annex_no is not None]
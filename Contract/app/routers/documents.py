@@ -6,7 +6,7 @@ from fastapi import APIRouter, Depends, Form, HTTPException, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 from starlette import status
 
-from app.auth import get_permissions_for_user, require_any_permission
+from app.auth import get_request_permissions, require_any_permission
 from app.context import FIELD_NAME
 from app.db_ops import _rows_from_db
 from app.db_models import UserRow
@@ -93,7 +93,7 @@ def create_document_unified(
     templates = request.app.state.templates
     y = date.today().year
 
-    perms = get_permissions_for_user(user=user)
+    perms = get_request_permissions(request, user=user)
     if doc_type == "contract":
         if "contracts.create" not in perms:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
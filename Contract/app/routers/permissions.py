@@ -1,13 +1,17 @@
 from __future__ import annotations
 
+import logging
+
 from fastapi import APIRouter, Depends, Form, Request
 from fastapi.responses import HTMLResponse, RedirectResponse
 
 from app.auth import PERMISSIONS, get_current_user, require_permission
 from app.db import session_scope
 from app.db_models import UserPermissionRow, UserRow
-from app.utils import get_breadcrumbs
+from app.utils import format_error_message, get_breadcrumbs, log_route_error
+
 
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
@@ -87,5 +91,6 @@ def permissions_save(
         )
 
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "permissions_save failed for %s", target_username)
+        msg = format_error_message(e)
         return RedirectResponse(url=f"/admin/permissions?error={msg}", status_code=303)
@@ -121,7 +121,7 @@ def _build_report(
 
     if src == "works":
         with session_scope() as db:
-            q = db.query(WorkRow)
+            q = db.query(WorkRow.imported_at)
             if user_filter:
                 q = q.filter(WorkRow.nguoi_thuc_hien == user_filter)
             db_rows = q.all()
@@ -141,7 +141,7 @@ def _build_report(
 
     else:
         with session_scope() as db:
-            q = db.query(ContractRecordRow)
+            q = db.query(ContractRecordRow.ngay_lap_hop_dong, ContractRecordRow.so_tien_value)
             if user_filter:
                 q = q.filter(ContractRecordRow.nguoi_thuc_hien_email == user_filter)
             db_rows = q.all()
@@ -49,24 +49,26 @@ def list_saved_files(year: int, user=Depends(require_permission("admin.ops.view"
 
     if year_dir_docx.exists():
         for f in year_dir_docx.glob("*.docx"):
+            st = f.stat()
             files.append(
                 {
                     "name": f.name,
                     "type": "docx",
-                    "size": f.stat().st_size,
-                    "modified": datetime.fromtimestamp(f.stat().st_mtime).strftime("%Y-%m-%d %H:%M"),
+                    "size": st.st_size,
+                    "modified": datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M"),
                     "url": f"/storage/docx/{year}/{f.name}",
                 }
             )
 
     if year_dir_excel.exists():
         for f in year_dir_excel.glob("*.xlsx"):
+            st = f.stat()
             files.append(
                 {
                     "name": f.name,
                     "type": "xlsx",
-                    "size": f.stat().st_size,
-                    "modified": datetime.fromtimestamp(f.stat().st_mtime).strftime("%Y-%m-%d %H:%M"),
+                    "size": st.st_size,
+                    "modified": datetime.fromtimestamp(st.st_mtime).strftime("%Y-%m-%d %H:%M"),
                     "url": f"/storage/excel/{year}/{f.name}",
                 }
             )
@@ -2,11 +2,11 @@ from __future__ import annotations
 
 from pathlib import Path
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request
 from fastapi.responses import FileResponse
 from starlette import status
 
-from app.auth import get_permissions_for_user, require_any_permission, require_permission
+from app.auth import get_request_permissions, require_any_permission, require_permission
 from app.config import PROJECT_ROOT
 from app.db_models import UserRow
 
@@ -32,9 +32,9 @@ def _safe_template_file(*, filename: str) -> Path:
 
 
 @router.get("/templates/export/{doc_type}/docx")
-def download_export_docx(doc_type: str, user: UserRow = Depends(require_any_permission("contracts.read", "annexes.read"))):
+def download_export_docx(request: Request, doc_type: str, user: UserRow = Depends(require_any_permission("contracts.read", "annexes.read"))):
     doc = (doc_type or "").strip().lower()
-    perms = get_permissions_for_user(user=user)
+    perms = get_request_permissions(request, user=user)
     if doc == "contract":
         if "contracts.read" not in perms:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -54,9 +54,9 @@ def download_export_docx(doc_type: str, user: UserRow = Depends(require_any_perm
 
 
 @router.get("/templates/export/{doc_type}/xlsx")
-def download_export_xlsx(doc_type: str, user: UserRow = Depends(require_any_permission("contracts.read", "annexes.read"))):
+def download_export_xlsx(request: Request, doc_type: str, user: UserRow = Depends(require_any_permission("contracts.read", "annexes.read"))):
     doc = (doc_type or "").strip().lower()
-    perms = get_permissions_for_user(user=user)
+    perms = get_request_permissions(request, user=user)
     if doc == "contract":
         if "contracts.read" not in perms:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import secrets
 
 from fastapi import APIRouter, Depends, Form, Request
@@ -8,9 +9,11 @@ from fastapi.responses import HTMLResponse, RedirectResponse
 from app.auth import _hash_password, get_current_user, require_any_permission, require_permission, set_user_password, verify_user_password
 from app.db import session_scope
 from app.db_models import UserRow
-from app.utils import get_breadcrumbs
+from app.utils import format_error_message, get_breadcrumbs, log_route_error
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
 
@@ -68,7 +71,8 @@ def account_password_submit(
         return RedirectResponse(url="/account/password?message=Đổi mật khẩu thành công", status_code=303)
 
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "password change failed for %s", user.username)
+        msg = format_error_message(e)
         return RedirectResponse(url=f"/account/password?error={msg}", status_code=303)
 
 
@@ -137,7 +141,8 @@ def admin_users_create(
         )
 
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "admin_users_create failed for %s", username)
+        msg = format_error_message(e)
         return RedirectResponse(url=f"/admin/users?error={msg}", status_code=303)
 
 
@@ -168,7 +173,8 @@ def admin_set_system_password(
         return RedirectResponse(url=f"/admin/users?message=Đã đổi mật khẩu cho {target}", status_code=303)
 
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "admin_set_system_password failed for %s", target_username)
+        msg = format_error_message(e)
         return RedirectResponse(url=f"/admin/users?error={msg}", status_code=303)
 
 
@@ -204,5 +210,6 @@ def admin_users_reset_password(
         )
 
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "admin_users_reset_password failed for %s", username)
+        msg = format_error_message(e)
         return RedirectResponse(url=f"/admin/users?error={msg}", status_code=303)
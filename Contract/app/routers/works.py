@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import logging
 import re
 from datetime import date, datetime
 from io import BytesIO
@@ -13,11 +14,26 @@ from app.config import STORAGE_DIR, STORAGE_EXCEL_DIR
 from app.db import session_scope
 from app.db_models import UserRow, WorkRow
 from app.services.safety import audit_log, safe_replace_bytes
-from app.utils import extract_channel_id, get_breadcrumbs
+from app.utils import extract_channel_id, format_error_message, get_breadcrumbs, log_route_error
 
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter()
 
+_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+_WATCH_RE = re.compile(r"watch\?v=([0-9A-Za-z_-]{6,})")
+_YOUTU_BE_RE = re.compile(r"youtu\.be/([0-9A-Za-z_-]{6,})")
+_HYPERLINK_RE = re.compile(r"HYPERLINK\(\"[^\"]*youtu(?:\.be/|be\.com/watch\?v=)([^\"&?#]+)", re.IGNORECASE)
+_ID_RE = re.compile(r"[0-9A-Za-z_-]{6,}")
+_CONTRACT_NO_RE = re.compile(r"HỢP\s*ĐỒNG\s*SỐ\s*([^\s]+)", re.IGNORECASE)
+_CONTRACT_DATE_RE = re.compile(r"NGÀY\s*(\d{1,2}/\d{1,2}/\d{4})", re.IGNORECASE)
+_ANNEX_NO_RE = re.compile(r"PHỤ\s*LỤC\s*SỐ\s*([^\s]+)", re.IGNORECASE)
+_ANNEX_DATE_RE = re.compile(r"PHỤ\s*LỤC\s*SỐ\s*[^\s]+\s*NGÀY\s*(\d{1,2}/\d{1,2}/\d{4})", re.IGNORECASE)
+_YOUTUBE_NAME_RE = re.compile(r"YOUTUBE\s+(.+)$", re.IGNORECASE)
+_URL_RE = re.compile(r"https?://\S+")
+_HHMMSS_RE = re.compile(r"^\s*(?:(\d+)\s*:\s*)?(\d+)\s*:\s*(\d+)\s*$")
+
 
 @router.get("/works", response_class=HTMLResponse)
 def works_list(
@@ -280,7 +296,8 @@ async def works_import_submit(
         return RedirectResponse(url=f"/works/import?message=Đã import {len(out_rows)} dòng vào DB", status_code=303)
 
     except Exception as e:
-        msg = f"{type(e).__name__}: {e}" if str(e) else f"{type(e).__name__}"
+        log_route_error(logger, "works import failed for %s", import_file.filename)
+        msg = format_error_message(e)
         return RedirectResponse(url=f"/works/import?error={msg}", status_code=303)
 
 
@@ -297,7 +314,7 @@ def _format_ddmmyyyy(v) -> str:
         return ""
 
     normalized = s.replace("-", "/").replace(".", "/")
-    m = re.search(r"(\d{1,2})/(\d{1,2})/(\d{4})", normalized)
+    m = _DATE_RE.search(normalized)
     if m:
         d, mo, y = int(m.group(1)), int(m.group(2)), int(m.group(3))
         return f"{d:02d}/{mo:02d}/{y:04d}"
@@ -313,21 +330,21 @@ def _extract_video_id(value) -> str:
         return ""
 
     if s.startswith("="):
-        m = re.search(r"watch\?v=([0-9A-Za-z_-]{6,})", s)
+        m = _WATCH_RE.search(s)
         if m:
             return m.group(1)
-        m = re.search(r"HYPERLINK\(\"[^\"]*youtu(?:\.be/|be\.com/watch\?v=)([^\"&?#]+)", s, re.IGNORECASE)
+        m = _HYPERLINK_RE.search(s)
         if m:
             return m.group(1)
 
-    m = re.search(r"watch\?v=([0-9A-Za-z_-]{6,})", s)
+    m = _WATCH_RE.search(s)
     if m:
         return m.group(1)
-    m = re.search(r"youtu\.be/([0-9A-Za-z_-]{6,})", s)
+    m = _YOUTU_BE_RE.search(s)
     if m:
         return m.group(1)
 
-    if re.fullmatch(r"[0-9A-Za-z_-]{6,}", s):
+    if _ID_RE.fullmatch(s):
         return s
     return ""
 
@@ -337,19 +354,14 @@ def _normalize_hhmmss(s: str) -> str:
     if not t:
         return ""
 
-    parts = [p.strip() for p in t.split(":")]
-    if len(parts) == 2:
-        hh = 0
-        mm = int(parts[0])
-        ss = int(parts[1])
-    elif len(parts) == 3:
-        hh = int(parts[0])
-        mm = int(parts[1])
-        ss = int(parts[2])
-    else:
+    m = _HHMMSS_RE.match(t)
+    if not m:
         raise ValueError("Thời lượng/thời gian phải theo định dạng hh:mm:ss hoặc mm:ss")
+    hh = int(m.group(1) or 0)
+    mm = int(m.group(2))
+    ss = int(m.group(3))
 
-    if mm < 0 or mm >= 60 or ss < 0 or ss >= 60 or hh < 0:
+    if mm >= 60 or ss >= 60:
         raise ValueError("Thời lượng/thời gian không hợp lệ")
 
     return f"{hh:02d}:{mm:02d}:{ss:02d}"
@@ -385,28 +397,28 @@ def _parse_import_metadata(ws) -> dict:
         s = " ".join(v.split())
 
         if "HỢP ĐỒNG SỐ" in s.upper() and not contract_no:
-            m = re.search(r"HỢP\s*ĐỒNG\s*SỐ\s*([^\s]+)", s, re.IGNORECASE)
+            m = _CONTRACT_NO_RE.search(s)
             if m:
                 contract_no = m.group(1).strip()
-            m2 = re.search(r"NGÀY\s*(\d{1,2}/\d{1,2}/\d{4})", s, re.IGNORECASE)
+            m2 = _CONTRACT_DATE_RE.search(s)
             if m2:
                 ngay_ky_hop_dong = _format_ddmmyyyy(m2.group(1))
 
         if "PHỤ LỤC SỐ" in s.upper() and not annex_no:
-            m = re.search(r"PHỤ\s*LỤC\s*SỐ\s*([^\s]+)", s, re.IGNORECASE)
+            m = _ANNEX_NO_RE.search(s)
             if m:
                 annex_no = m.group(1).strip()
-            m2 = re.search(r"PHỤ\s*LỤC\s*SỐ\s*[^\s]+\s*NGÀY\s*(\d{1,2}/\d{1,2}/\d{4})", s, re.IGNORECASE)
+            m2 = _ANNEX_DATE_RE.search(s)
             if m2:
                 ngay_ky_phu_luc = _format_ddmmyyyy(m2.group(1))
 
         if "YOUTUBE" in s.upper() and not ten_kenh:
-            m = re.search(r"YOUTUBE\s+(.+)$", s, re.IGNORECASE)
+            m = _YOUTUBE_NAME_RE.search(s)
             if m:
                 ten_kenh = m.group(1).strip()
 
         if ("http://" in s.lower() or "https://" in s.lower()) and not link_kenh:
-            m = re.search(r"https?://\S+", s)
+            m = _URL_RE.search(s)
             if m:
                 link_kenh = m.group(0).strip()
 
@@ -414,7 +426,7 @@ def _parse_import_metadata(ws) -> dict:
         for r in range(1, min(ws.max_row, 20) + 1):
             v = ws.cell(row=r, column=1).value
             if isinstance(v, str) and ("http://" in v.lower() or "https://" in v.lower()):
-                m = re.search(r"https?://\S+", v)
+                m = _URL_RE.search(v)
                 if m:
                     link_kenh = m.group(0).strip()
                     break
@@ -471,7 +483,8 @@ def _col(hmap: dict[str, int], *names: str) -> int | None:
 
 
 def _year_from_contract_no(contract_no: str) -> int:
-    parts = (contract_no or "").split("/")
-    if len(parts) >= 2 and parts[1].isdigit():
-        return int(parts[1])
+    # Second "/"-separated segment, without splitting the whole string
+    year_part = (contract_no or "").partition("/")[2].partition("/")[0]
+    if year_part.isdigit():
+        return int(year_part)
     return date.today().year
@@ -1,18 +1,26 @@
 from __future__ import annotations
 
+from contextlib import contextmanager
 from dataclasses import asdict
 import re
 import shutil
 from datetime import datetime
 from pathlib import Path
-from typing import Iterable
+from typing import Callable, Iterable, Iterator
 
 from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font
 
+try:
+    # Optional Rust-backed reader; several times faster than openpyxl for read-only scans.
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
 from app.config import STORAGE_DIR
 from app.models import ContractRecord
-from app.services.safety import audit_log, backup_file, file_lock
+from app.services.safety import audit_log, backup_file_coalesced, file_lock
 
 
 HEADERS = [
@@ -85,6 +93,16 @@ WORKS_HEADERS = [
 
 _WORKS_FONT = Font(name="Times New Roman", size=12)
 
+_HEADERS_SET = frozenset(HEADERS)
+_WORKS_HEADERS_SET = frozenset(WORKS_HEADERS)
+_TEXT_HEADERS = frozenset(h for h in HEADERS if h.endswith("_text"))
+# Case-insensitive header -> canonical HEADERS spelling (e.g. legacy "so_cccd" -> "so_CCCD")
+_CANONICAL_HEADERS = {h.lower(): h for h in HEADERS}
+
+_CONTRACT_DATE_COL = HEADERS.index("ngay_lap_hop_dong") + 1
+
+_CATALOGUE_PLACEHOLDER_RE = re.compile(r"<\s*([^<>\s]+)\s*>")
+
 
 _BACKUPS_DIR = STORAGE_DIR / "backups"
 _LOGS_DIR = STORAGE_DIR / "logs"
@@ -96,20 +114,33 @@ def _apply_works_font(ws, *, row: int, max_col: int) -> None:
         ws.cell(row=row, column=c).font = _WORKS_FONT
 
 
+def _works_row_cells(ws, values: Iterable[object]) -> list:
+    # Cells are created with the shared font up front so ws.append() doesn't need a
+    # second per-cell pass; works for both write-only and regular worksheets.
+    out = []
+    for v in values:
+        cell = WriteOnlyCell(ws, value=v)
+        cell.font = _WORKS_FONT
+        out.append(cell)
+    return out
+
+
 def _rebuild_works_workbook(path: Path) -> None:
     backup = path.with_suffix(path.suffix + ".bak_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
     shutil.copyfile(path, backup)
 
-    wb_old = load_workbook(str(path))
-    ws_old = wb_old["Works"] if "Works" in wb_old.sheetnames else wb_old.active
+    wb_old = load_workbook(str(path), read_only=True)
+    try:
+        ws_old = wb_old["Works"]
+    except KeyError:
+        ws_old = wb_old.active
+    old_rows = ws_old.iter_rows(values_only=True)
 
-    old_headers: list[str] = []
-    if ws_old.max_row >= 1 and ws_old.max_column >= 1:
-        old_headers = [ws_old.cell(row=1, column=c).value for c in range(1, ws_old.max_column + 1)]
+    old_headers = next(old_rows, None) or ()
     old_headers_norm = [h if isinstance(h, str) else "" for h in old_headers]
 
     # Preserve extra columns (if any) by keeping them at the end
-    extra_headers = [h for h in old_headers_norm if h and h not in WORKS_HEADERS]
+    extra_headers = [h for h in old_headers_norm if h and h not in _WORKS_HEADERS_SET]
     final_headers = WORKS_HEADERS + extra_headers
 
     # Map header -> column index in old
@@ -118,34 +149,32 @@ def _rebuild_works_workbook(path: Path) -> None:
         if h and h not in col_map:
             col_map[h] = idx
 
-    wb_new = Workbook()
-    ws_new = wb_new.active
-    ws_new.title = "Works"
-    ws_new.append(final_headers)
-    _apply_works_font(ws_new, row=1, max_col=len(final_headers))
+    wb_new = Workbook(write_only=True)
+    ws_new = wb_new.create_sheet("Works")
+    ws_new.append(_works_row_cells(ws_new, final_headers))
 
-    for r in range(2, ws_old.max_row + 1):
+    for r in old_rows:
         row_dict: dict[str, object] = {}
         for h, c in col_map.items():
-            row_dict[h] = ws_old.cell(row=r, column=c).value
-        ws_new.append([row_dict.get(h) for h in final_headers])
-        _apply_works_font(ws_new, row=ws_new.max_row, max_col=len(final_headers))
+            row_dict[h] = r[c - 1] if c <= len(r) else None
+        ws_new.append(_works_row_cells(ws_new, (row_dict.get(h) for h in final_headers)))
 
+    wb_old.close()
     wb_new.save(str(path))
 
 
-def _ensure_works_workbook(path: Path) -> None:
+def _ensure_works_workbook(path: Path) -> Workbook:
+    """Return a writable workbook with a canonical "Works" sheet; the caller saves and closes it."""
     path.parent.mkdir(parents=True, exist_ok=True)
     if path.exists():
         wb = load_workbook(str(path))
-        if "Works" not in wb.sheetnames:
+        try:
+            ws = wb["Works"]
+        except KeyError:
             ws = wb.create_sheet("Works")
-            ws.append(WORKS_HEADERS)
-            _apply_works_font(ws, row=1, max_col=len(WORKS_HEADERS))
-            wb.save(str(path))
-            return
+            ws.append(_works_row_cells(ws, WORKS_HEADERS))
+            return wb
 
-        ws = wb["Works"]
         max_col = ws.max_column if ws.max_column and ws.max_column > 0 else 0
         existing_headers_raw: list[str] = []
         if ws.max_row >= 1 and max_col > 0:
@@ -156,34 +185,34 @@ def _ensure_works_workbook(path: Path) -> None:
         if existing_headers[: len(WORKS_HEADERS)] != WORKS_HEADERS:
             wb.close()
             _rebuild_works_workbook(path)
-            return
+            return load_workbook(str(path))
 
         # Ensure header row font is consistent
         _apply_works_font(ws, row=1, max_col=max(len(WORKS_HEADERS), ws.max_column))
-        wb.save(str(path))
-        return
+        return wb
 
     wb = Workbook()
     ws = wb.active
     ws.title = "Works"
-    ws.append(WORKS_HEADERS)
-    _apply_works_font(ws, row=1, max_col=len(WORKS_HEADERS))
-    wb.save(str(path))
+    ws.append(_works_row_cells(ws, WORKS_HEADERS))
+    return wb
 
 
 def append_works_rows(*, excel_path: Path, rows: list[dict]) -> None:
-    _ensure_works_workbook(excel_path)
     lock_path = _LOCKS_DIR / (excel_path.name + ".lock")
     with file_lock(lock_path):
-        backup_file(excel_path, backup_dir=_BACKUPS_DIR / "excel")
-        wb = load_workbook(str(excel_path))
-        ws = wb["Works"]
+        # The validated workbook is reused for the append, so the file is parsed once.
+        wb = _ensure_works_workbook(excel_path)
+        try:
+            backup_file_coalesced(excel_path, backup_dir=_BACKUPS_DIR / "excel")
+            ws = wb["Works"]
 
-        for r in rows:
-            ws.append([r.get(h) for h in WORKS_HEADERS])
-            _apply_works_font(ws, row=ws.max_row, max_col=len(WORKS_HEADERS))
+            for r in rows:
+                ws.append(_works_row_cells(ws, (r.get(h) for h in WORKS_HEADERS)))
 
-        wb.save(str(excel_path))
+            wb.save(str(excel_path))
+        finally:
+            wb.close()
 
     audit_log(
         log_dir=_LOGS_DIR,
@@ -195,51 +224,76 @@ def append_works_rows(*, excel_path: Path, rows: list[dict]) -> None:
     )
 
 
+def _normalize_headers(raw_headers: Iterable[object]) -> list[str | None]:
+    headers: list[str | None] = []
+    for h in raw_headers:
+        if isinstance(h, str) and h.strip():
+            s = h.strip()
+            headers.append(_CANONICAL_HEADERS.get(s.lower(), s))
+        else:
+            headers.append(None)
+    return headers
+
+
 def _rebuild_contracts_workbook(path: Path) -> None:
     backup = path.with_suffix(path.suffix + ".bak_" + datetime.now().strftime("%Y%m%d_%H%M%S"))
     shutil.copyfile(path, backup)
 
-    wb_old = load_workbook(str(path))
-    ws_old = wb_old["Contracts"] if "Contracts" in wb_old.sheetnames else wb_old.active
-    rows = list(ws_old.iter_rows(values_only=True))
-    if not rows:
+    wb_old = load_workbook(str(path), read_only=True)
+    try:
+        ws_old = wb_old["Contracts"]
+    except KeyError:
+        ws_old = wb_old.active
+    rows = ws_old.iter_rows(values_only=True)
+    raw_headers = next(rows, None)
+    if raw_headers is None:
+        wb_old.close()
         return
 
-    raw_headers = list(rows[0])
-    headers: list[str | None] = []
-    for h in raw_headers:
-        if isinstance(h, str) and h.strip():
-            headers.append(h.strip())
-        else:
-            headers.append(None)
+    headers = _normalize_headers(raw_headers)
+    slots = [(i, key) for i, key in enumerate(headers) if key in _HEADERS_SET]
 
-    wb_new = Workbook()
-    ws_new = wb_new.active
-    ws_new.title = "Contracts"
+    wb_new = Workbook(write_only=True)
+    ws_new = wb_new.create_sheet("Contracts")
     ws_new.append(HEADERS)
 
-    for r in rows[1:]:
-        if not any(r):
-            continue
+    for r in rows:
+        # One pass both builds the record and detects blank rows
+        n = len(r)
+        found = False
         row_dict: dict = {}
-        for i in range(min(len(headers), len(r))):
-            key = headers[i]
-            if not key:
-                continue
+        for i, key in slots:
+            if i >= n:
+                break
             v = r[i]
-            if isinstance(v, str) and key.endswith("_text"):
+            if not v:
+                row_dict.setdefault(key, v)
+                continue
+            found = True
+            if row_dict.get(key):
+                # Duplicate column (e.g. so_CCCD and legacy so_cccd): the first non-empty value wins
+                continue
+            if isinstance(v, str) and key in _TEXT_HEADERS:
                 v = v.replace("VNĐ", "").replace("VND", "").strip()
             row_dict[key] = v
+        if not found:
+            continue
         ws_new.append([row_dict.get(h) for h in HEADERS])
 
+    # Finish reading the old file before overwriting it
+    wb_old.close()
     wb_new.save(str(path))
 
 
-def _ensure_workbook(path: Path) -> None:
+def _ensure_workbook(path: Path) -> Workbook:
+    """Return a writable workbook with a canonical "Contracts" sheet; the caller saves and closes it."""
     path.parent.mkdir(parents=True, exist_ok=True)
     if path.exists():
         wb = load_workbook(str(path))
-        ws = wb["Contracts"] if "Contracts" in wb.sheetnames else wb.active
+        try:
+            ws = wb["Contracts"]
+        except KeyError:
+            ws = wb.active
         if ws.title != "Contracts":
             ws.title = "Contracts"
 
@@ -251,8 +305,7 @@ def _ensure_workbook(path: Path) -> None:
 
         if not any(existing_headers):
             ws.append(HEADERS)
-            wb.save(str(path))
-            return
+            return wb
 
         existing_set = {h for h in existing_headers if isinstance(h, str) and h}
         missing = [h for h in HEADERS if h not in existing_set]
@@ -261,53 +314,45 @@ def _ensure_workbook(path: Path) -> None:
             start_col = (ws.max_column if ws.max_column and ws.max_column > 0 else len(existing_headers)) + 1
             for i, h in enumerate(missing):
                 ws.cell(row=1, column=start_col + i, value=h)
-            wb.save(str(path))
 
         # If the workbook has been through schema changes, some rows may be misaligned.
         # Rebuild once when we detect the header row isn't already canonical.
         canonical_prefix = existing_headers[: len(HEADERS)]
         canonical_like = [h if isinstance(h, str) else None for h in canonical_prefix] == HEADERS
         if not canonical_like:
+            # The rebuild rewrites every header, so the in-memory header fixes above are moot.
+            wb.close()
             _rebuild_contracts_workbook(path)
-        return
+            return load_workbook(str(path))
+        return wb
     wb = Workbook()
     ws = wb.active
     ws.title = "Contracts"
     ws.append(HEADERS)
-    wb.save(str(path))
+    return wb
 
 
 def append_contract_row(*, excel_path: Path, record: ContractRecord) -> None:
-    _ensure_workbook(excel_path)
-
     lock_path = _LOCKS_DIR / (excel_path.name + ".lock")
     with file_lock(lock_path):
-        backup_file(excel_path, backup_dir=_BACKUPS_DIR / "excel")
-        wb = load_workbook(str(excel_path))
-        ws = wb["Contracts"]
-
-        row = []
-        data = record.model_dump()
-        for h in HEADERS:
-            v = data.get(h)
-            row.append(v)
-
-        ws.append(row)
-
-        # Set date format for ngay_lap_hop_dong column (dd/mm/yyyy)
-        row_num = ws.max_row
-        date_col_idx = None
-        for idx, header in enumerate(HEADERS, start=1):
-            if header == "ngay_lap_hop_dong":
-                date_col_idx = idx
-                break
+        # The validated workbook is reused for the append, so the file is parsed once.
+        wb = _ensure_workbook(excel_path)
+        try:
+            backup_file_coalesced(excel_path, backup_dir=_BACKUPS_DIR / "excel")
+            ws = wb["Contracts"]
 
-        if date_col_idx:
-            cell = ws.cell(row=row_num, column=date_col_idx)
+            data = record.model_dump()
+            ws.append([data.get(h) for h in HEADERS])
+
+            # Set date format for ngay_lap_hop_dong column (dd/mm/yyyy)
+            cell = ws.cell(row=ws.max_row, column=_CONTRACT_DATE_COL)
             if cell.value:
                 cell.number_format = "dd/mm/yyyy"
 
-        wb.save(str(excel_path))
+            wb.save(str(excel_path))
+        finally:
+            wb.close()
+
     audit_log(
         log_dir=_LOGS_DIR,
         event={
@@ -320,37 +365,122 @@ def append_contract_row(*, excel_path: Path, record: ContractRecord) -> None:
     )
 
 
+def _calamine_value(v: object) -> object:
+    # Match openpyxl's values: blank cells are None, whole numbers come back as int.
+    if v == "":
+        return None
+    if type(v) is float and v.is_integer():
+        return int(v)
+    return v
+
+
+@contextmanager
+def _sheet_reader(path: Path, sheet_name: str) -> Iterator[Callable[..., Iterator[tuple]]]:
+    """Open a sheet for reading and yield an iter_rows(min_row=, max_row=, min_col=, max_col=) over its values.
+
+    Uses calamine when installed, else openpyxl read-only mode, which streams the sheet
+    XML instead of building the full cell DOM. Rows and columns are 1-based like openpyxl.
+    """
+    if CalamineWorkbook is not None:
+        cwb = CalamineWorkbook.from_path(str(path))
+        if sheet_name not in cwb.sheet_names:
+            raise KeyError(f"Worksheet {sheet_name} does not exist.")
+        data = cwb.get_sheet_by_name(sheet_name).to_python(skip_empty_area=False)
+
+        def iter_calamine_rows(*, min_row: int = 1, max_row: int | None = None, min_col: int = 1, max_col: int | None = None):
+            for r in data[min_row - 1 : max_row]:
+                yield tuple(_calamine_value(v) for v in r[min_col - 1 : max_col])
+
+        yield iter_calamine_rows
+        return
+
+    wb = load_workbook(str(path), read_only=True)
+    try:
+        ws = wb[sheet_name]
+
+        def iter_openpyxl_rows(*, min_row: int = 1, max_row: int | None = None, min_col: int = 1, max_col: int | None = None):
+            return ws.iter_rows(min_row=min_row, max_row=max_row, min_col=min_col, max_col=max_col, values_only=True)
+
+        yield iter_openpyxl_rows
+    finally:
+        wb.close()
+
+
 def read_contracts(*, excel_path: Path) -> list[dict]:
     if not excel_path.exists():
         return []
 
-    wb = load_workbook(str(excel_path))
-    ws = wb["Contracts"]
-
-    rows = list(ws.iter_rows(values_only=True))
-    if not rows:
-        return []
+    with _sheet_reader(excel_path, "Contracts") as iter_rows:
+        rows = iter_rows()
+        raw_headers = next(rows, None)
+        if raw_headers is None:
+            return []
 
-    raw_headers = list(rows[0])
-    headers: list[str | None] = []
-    for h in raw_headers:
-        if isinstance(h, str) and h.strip():
-            headers.append(h.strip())
-        else:
-            headers.append(None)
+        headers = _normalize_headers(raw_headers)
+        slots = [(i, key) for i, key in enumerate(headers) if key]
 
-    out: list[dict] = []
-    for r in rows[1:]:
-        if not any(r):
-            continue
-        row_dict: dict = {}
-        for i in range(min(len(headers), len(r))):
-            key = headers[i]
-            if not key:
+        out: list[dict] = []
+        for r in rows:
+            # One pass both builds the record and detects blank rows
+            n = len(r)
+            found = False
+            row_dict: dict = {}
+            for i, key in slots:
+                if i >= n:
+                    break
+                v = r[i]
+                if v:
+                    found = True
+                    # Duplicate column (e.g. so_CCCD and legacy so_cccd): the first non-empty value wins
+                    if not row_dict.get(key):
+                        row_dict[key] = v
+                else:
+                    row_dict.setdefault(key, v)
+            if found:
+                out.append(row_dict)
+        return out
+
+
+def _header_columns(headers: list[str | None]) -> dict[str, int]:
+    """Map header name -> 1-based column; a duplicated header maps to its first column."""
+    cols: dict[str, int] = {}
+    for i, h in enumerate(headers, start=1):
+        if h and h not in cols:
+            cols[h] = i
+    return cols
+
+
+def _locate_contract_row(excel_path: Path, *, contract_no: str, annex_no: str | None) -> tuple[list[str | None], int | None]:
+    """Find the 1-based sheet row of a contract/annex with a read-only scan; returns (headers, row_idx)."""
+    with _sheet_reader(excel_path, "Contracts") as iter_rows:
+        raw_headers = next(iter(iter_rows(max_row=1)), None)
+        if raw_headers is None:
+            return [], None
+
+        headers = _normalize_headers(raw_headers)
+        col_of = _header_columns(headers)
+        contract_col = col_of.get("contract_no")
+        annex_col = col_of.get("annex_no")
+        if contract_col is None:
+            return headers, None
+
+        # Only the key columns are read for the data rows; indexes below are relative to first_col.
+        key_cols = [contract_col] if annex_col is None else [contract_col, annex_col]
+        first_col = min(key_cols)
+        contract_no_idx = contract_col - first_col
+        annex_no_idx = annex_col - first_col if annex_col is not None else None
+        rows = iter_rows(min_row=2, min_col=first_col, max_col=max(key_cols))
+        for row_idx, r in enumerate(rows, start=2):
+            row_contract_no = r[contract_no_idx] if contract_no_idx < len(r) else None
+            if row_contract_no != contract_no:
                 continue
-            row_dict[key] = r[i]
-        out.append(row_dict)
-    return out
+            row_annex_no = r[annex_no_idx] if annex_no_idx is not None and annex_no_idx < len(r) else None
+            if annex_no is None:
+                if not row_annex_no:
+                    return headers, row_idx
+            elif row_annex_no == annex_no:
+                return headers, row_idx
+        return headers, None
 
 
 def update_contract_row(*, excel_path: Path, contract_no: str, annex_no: str | None, updated_data: dict) -> bool:
@@ -359,57 +489,20 @@ def update_contract_row(*, excel_path: Path, contract_no: str, annex_no: str | N
 
     lock_path = _LOCKS_DIR / (excel_path.name + ".lock")
     with file_lock(lock_path):
-        backup_file(excel_path, backup_dir=_BACKUPS_DIR / "excel")
-        wb = load_workbook(str(excel_path))
-        ws = wb["Contracts"]
-
-        rows = list(ws.iter_rows(values_only=True))
-        if not rows:
-            wb.close()
-            return False
-
-        raw_headers = list(rows[0])
-        headers: list[str | None] = []
-        for h in raw_headers:
-            if isinstance(h, str) and h.strip():
-                headers.append(h.strip())
-            else:
-                headers.append(None)
-
-        contract_no_idx = None
-        annex_no_idx = None
-        for i, h in enumerate(headers):
-            if h == "contract_no":
-                contract_no_idx = i
-            if h == "annex_no":
-                annex_no_idx = i
-
-        if contract_no_idx is None:
-            wb.close()
-            return False
-
-        found = False
-        for row_idx in range(2, ws.max_row + 1):
-            row_contract_no = ws.cell(row=row_idx, column=contract_no_idx + 1).value
-            row_annex_no = ws.cell(row=row_idx, column=annex_no_idx + 1).value if annex_no_idx is not None else None
-
-            if row_contract_no == contract_no:
-                if annex_no is None:
-                    if not row_annex_no:
-                        found = True
-                else:
-                    if row_annex_no == annex_no:
-                        found = True
-
-                if found:
-                    for header_idx, header in enumerate(headers):
-                        if header and header in updated_data:
-                            ws.cell(row=row_idx, column=header_idx + 1, value=updated_data[header])
-                    break
-
+        # Locate the row with a streaming scan; only load the writable DOM when there is something to change.
+        headers, row_idx = _locate_contract_row(excel_path, contract_no=contract_no, annex_no=annex_no)
+        found = row_idx is not None
         if found:
+            backup_file_coalesced(excel_path, backup_dir=_BACKUPS_DIR / "excel")
+            wb = load_workbook(str(excel_path))
+            ws = wb["Contracts"]
+            col_of = _header_columns(headers)
+            for header, v in updated_data.items():
+                col = col_of.get(header)
+                if col is not None:
+                    ws.cell(row=row_idx, column=col, value=v)
             wb.save(str(excel_path))
-        wb.close()
+            wb.close()
 
     if found:
         audit_log(
@@ -431,56 +524,17 @@ def delete_contract_row(*, excel_path: Path, contract_no: str, annex_no: str | N
 
     lock_path = _LOCKS_DIR / (excel_path.name + ".lock")
     with file_lock(lock_path):
-        backup_file(excel_path, backup_dir=_BACKUPS_DIR / "excel")
-        wb = load_workbook(str(excel_path))
-        ws = wb["Contracts"]
-
-        rows = list(ws.iter_rows(values_only=True))
-        if not rows:
-            wb.close()
-            return False
-
-        raw_headers = list(rows[0])
-        headers: list[str | None] = []
-        for h in raw_headers:
-            if isinstance(h, str) and h.strip():
-                headers.append(h.strip())
-            else:
-                headers.append(None)
-
-        contract_no_idx = None
-        annex_no_idx = None
-        for i, h in enumerate(headers):
-            if h == "contract_no":
-                contract_no_idx = i
-            if h == "annex_no":
-                annex_no_idx = i
-
-        if contract_no_idx is None:
-            wb.close()
-            return False
-
-        row_to_delete = None
-        for row_idx in range(2, ws.max_row + 1):
-            row_contract_no = ws.cell(row=row_idx, column=contract_no_idx + 1).value
-            row_annex_no = ws.cell(row=row_idx, column=annex_no_idx + 1).value if annex_no_idx is not None else None
-
-            if row_contract_no == contract_no:
-                if annex_no is None:
-                    if not row_annex_no:
-                        row_to_delete = row_idx
-                        break
-                else:
-                    if row_annex_no == annex_no:
-                        row_to_delete = row_idx
-                        break
+        _, row_to_delete = _locate_contract_row(excel_path, contract_no=contract_no, annex_no=annex_no)
 
         deleted = False
         if row_to_delete:
+            backup_file_coalesced(excel_path, backup_dir=_BACKUPS_DIR / "excel")
+            wb = load_workbook(str(excel_path))
+            ws = wb["Contracts"]
             ws.delete_rows(row_to_delete)
             wb.save(str(excel_path))
+            wb.close()
             deleted = True
-        wb.close()
 
     if deleted:
         audit_log(
@@ -501,20 +555,20 @@ def export_catalogue_excel(*, template_path: Path, output_path: Path, context: d
     shutil.copyfile(template_path, output_path)
 
     wb = load_workbook(str(output_path))
-    ws = wb[sheet_name] if sheet_name in wb.sheetnames else wb.active
-
-    def replace_placeholders(text: str) -> str:
-        def repl(m: re.Match[str]) -> str:
-            key = m.group(1).strip()
-            v = context.get(key, "")
-            return "" if v is None else str(v)
+    try:
+        ws = wb[sheet_name]
+    except KeyError:
+        ws = wb.active
 
-        return re.sub(r"<\s*([^<>\s]+)\s*>", repl, text)
+    def repl(m: re.Match[str]) -> str:
+        key = m.group(1).strip()
+        v = context.get(key, "")
+        return "" if v is None else str(v)
 
     for row in ws.iter_rows():
         for cell in row:
             v = cell.value
             if isinstance(v, str) and "<" in v and ">" in v:
-                cell.value = replace_placeholders(v)
+                cell.value = _CATALOGUE_PLACEHOLDER_RE.sub(repl, v)
 
     wb.save(str(output_path))
@@ -1,7 +1,11 @@
 from __future__ import annotations
 
+import atexit
 import json
+import logging
+import queue
 import shutil
+import threading
 import time
 from contextlib import contextmanager
 from datetime import datetime
@@ -9,6 +13,9 @@ from pathlib import Path
 from typing import Any
 
 
+logger = logging.getLogger(__name__)
+
+
 def _ts() -> str:
     return datetime.now().strftime("%Y%m%d_%H%M%S")
 
@@ -53,6 +60,36 @@ def backup_file(path: Path, *, backup_dir: Path) -> Path | None:
     return backup_path
 
 
+_last_backup_at: dict[Path, float] = {}
+_last_backup_lock = threading.Lock()
+
+
+def backup_file_coalesced(path: Path, *, backup_dir: Path, min_interval_seconds: float = 30.0) -> Path | None:
+    """Like backup_file, but skip the copy if this file was backed up less than min_interval_seconds ago.
+
+    Bursts of edits to the same workbook then cost one full-file copy instead of one per edit;
+    the retained backup is the state before the first edit of the burst.
+    """
+    key = path.resolve()
+    now = time.monotonic()
+    with _last_backup_lock:
+        last = _last_backup_at.get(key)
+        if last is not None and now - last < min_interval_seconds:
+            return None
+        _last_backup_at[key] = now
+
+    backup_path = None
+    try:
+        backup_path = backup_file(path, backup_dir=backup_dir)
+        return backup_path
+    finally:
+        # Nothing copied (file not created yet, or the copy failed): don't hold the slot
+        if backup_path is None:
+            with _last_backup_lock:
+                if _last_backup_at.get(key) == now:
+                    _last_backup_at.pop(key, None)
+
+
 def safe_replace_bytes(path: Path, data: bytes, *, backup_dir: Path | None = None) -> Path | None:
     if backup_dir is not None:
         backup_file(path, backup_dir=backup_dir)
@@ -81,10 +118,84 @@ def safe_move_to_backup(path: Path, *, backup_dir: Path) -> Path | None:
     return target
 
 
+_audit_queue: queue.Queue[tuple[Path, str] | None] = queue.Queue()
+_audit_thread: threading.Thread | None = None
+_audit_thread_lock = threading.Lock()
+# Set at interpreter exit; later entries are appended synchronously instead of queued
+_audit_stopped = False
+_AUDIT_BATCH_MAX = 1000
+
+
+def _append_audit_lines(out_path: Path, lines: list[str]) -> None:
+    try:
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        with out_path.open("a", encoding="utf-8") as f:
+            f.write("".join(lines))
+    except Exception:
+        logger.exception("audit log write failed: %s (%d entries lost)", out_path, len(lines))
+
+
+def _audit_writer() -> None:
+    while True:
+        # Block for one entry, then drain whatever else is already queued so a
+        # burst of events costs one open/write per file instead of one per event.
+        items = [_audit_queue.get()]
+        while len(items) < _AUDIT_BATCH_MAX:
+            try:
+                items.append(_audit_queue.get_nowait())
+            except queue.Empty:
+                break
+
+        stop = False
+        lines_by_path: dict[Path, list[str]] = {}
+        for item in items:
+            if item is None:
+                stop = True
+                continue
+            out_path, line = item
+            lines_by_path.setdefault(out_path, []).append(line)
+
+        for out_path, lines in lines_by_path.items():
+            _append_audit_lines(out_path, lines)
+
+        if stop:
+            return
+
+
+def _stop_audit_writer(timeout_seconds: float = 5.0) -> None:
+    global _audit_thread, _audit_stopped
+    with _audit_thread_lock:
+        _audit_stopped = True
+        t = _audit_thread
+        _audit_thread = None
+        if t is None:
+            return
+        # Queued under the lock, so the sentinel is the last entry the writer sees
+        _audit_queue.put(None)
+    t.join(timeout_seconds)
+
+
+atexit.register(_stop_audit_writer)
+
+
 def audit_log(*, log_dir: Path, event: dict[str, Any]) -> None:
-    log_dir.mkdir(parents=True, exist_ok=True)
+    global _audit_thread
+    # Serialize on the caller's thread (timestamp and event snapshot are taken now);
+    # the file append happens on a background writer so mutations don't wait on disk I/O.
+    now = datetime.now()
     event = dict(event)
-    event.setdefault("ts", datetime.now().isoformat(timespec="seconds"))
-    out_path = log_dir / f"audit_{datetime.now().strftime('%Y%m')}.jsonl"
-    with out_path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(event, ensure_ascii=False) + "\n")
+    if "ts" not in event:
+        event["ts"] = now.isoformat(timespec="seconds")
+    out_path = log_dir / f"audit_{now:%Y%m}.jsonl"
+    line = json.dumps(event, ensure_ascii=False) + "\n"
+
+    with _audit_thread_lock:
+        if not _audit_stopped:
+            if _audit_thread is None:
+                _audit_thread = threading.Thread(target=_audit_writer, name="audit-log-writer", daemon=True)
+                _audit_thread.start()
+            _audit_queue.put((out_path, line))
+            return
+
+    # The writer has already been stopped (interpreter exit): append synchronously
+    _append_audit_lines(out_path, [line])
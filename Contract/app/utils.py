@@ -1,6 +1,13 @@
 from __future__ import annotations
 
+import logging
 import re
+import sys
+
+
+_MULTI_VALUE_SEPARATORS_TABLE = str.maketrans(";,", "  ")
+_MONEY_SEPARATORS_TABLE = str.maketrans("", "", ".,")
+_CHANNEL_ID_RE = re.compile(r"(UC[0-9A-Za-z_-]{10,})")
 
 
 def clean_opt(v) -> str:
@@ -9,22 +16,21 @@ def clean_opt(v) -> str:
     return str(v).strip()
 
 
-def normalize_multi_emails(s: str) -> str:
+def _join_multi_values(s: str) -> str:
     raw = clean_opt(s)
     if not raw:
         return ""
-    parts = re.split(r"[;,\s]+", raw)
-    parts = [p.strip() for p in parts if p.strip()]
+    # ";" and "," become spaces so a single split() handles every separator
+    parts = raw.translate(_MULTI_VALUE_SEPARATORS_TABLE).split()
     return ";".join(dict.fromkeys(parts))
 
 
+def normalize_multi_emails(s: str) -> str:
+    return _join_multi_values(s)
+
+
 def normalize_multi_phones(s: str) -> str:
-    raw = clean_opt(s)
-    if not raw:
-        return ""
-    parts = re.split(r"[;,\s]+", raw)
-    parts = [p.strip() for p in parts if p.strip()]
-    return ";".join(dict.fromkeys(parts))
+    return _join_multi_values(s)
 
 
 def normalize_money_to_int(s: str) -> int:
@@ -32,8 +38,8 @@ def normalize_money_to_int(s: str) -> int:
     if not raw:
         return 0
     cleaned = raw.replace("VNĐ", "").replace("VND", "")
-    cleaned = cleaned.replace(".", "").replace(",", "")
-    cleaned = re.sub(r"\s+", "", cleaned)
+    # Drop thousands separators and any whitespace
+    cleaned = "".join(cleaned.translate(_MONEY_SEPARATORS_TABLE).split())
     return int(cleaned)
 
 
@@ -57,7 +63,7 @@ def extract_channel_id(value) -> str:
     s = str(value).strip()
     if not s:
         return ""
-    m = re.search(r"(UC[0-9A-Za-z_-]{10,})", s)
+    m = _CHANNEL_ID_RE.search(s)
     if m:
         return m.group(1)
     return ""
@@ -76,6 +82,62 @@ def normalize_youtube_channel_input(value: str) -> tuple[str, str]:
     return cid, link
 
 
+_VI_DIGITS = ("không", "một", "hai", "ba", "bốn", "năm", "sáu", "bảy", "tám", "chín")
+_VI_SCALES = ("", "nghìn", "triệu", "tỷ", "nghìn tỷ", "triệu tỷ", "tỷ tỷ")
+
+
+def _vi_two_digits(tens: int, ones: int, *, has_hundreds: bool) -> list[str]:
+    out: list[str] = []
+    if tens == 0:
+        if ones != 0:
+            if has_hundreds:
+                out.append("lẻ")
+            if ones == 5 and has_hundreds:
+                out.append("lăm")
+            else:
+                out.append(_VI_DIGITS[ones])
+        return out
+    if tens == 1:
+        out.append("mười")
+        if ones == 0:
+            return out
+        if ones == 5:
+            out.append("lăm")
+        else:
+            out.append(_VI_DIGITS[ones])
+        return out
+
+    out.append(_VI_DIGITS[tens])
+    out.append("mươi")
+    if ones == 0:
+        return out
+    if ones == 1:
+        out.append("mốt")
+    elif ones == 4:
+        out.append("tư")
+    elif ones == 5:
+        out.append("lăm")
+    else:
+        out.append(_VI_DIGITS[ones])
+    return out
+
+
+def _vi_three_digits_compute(num: int, *, force_full: bool) -> str:
+    h = num // 100
+    t = (num // 10) % 10
+    o = num % 10
+    if h != 0 or force_full:
+        out = [_VI_DIGITS[h], "trăm", *_vi_two_digits(t, o, has_hundreds=True)]
+    else:
+        out = _vi_two_digits(t, o, has_hundreds=False)
+    return " ".join(out)
+
+
+# Every 3-digit group is read from these tables; "full" spells out a leading "không trăm".
+_VI_THREE_DIGITS_FULL = tuple(_vi_three_digits_compute(i, force_full=True) for i in range(1000))
+_VI_THREE_DIGITS_SHORT = tuple(_vi_three_digits_compute(i, force_full=False) for i in range(1000))
+
+
 def money_to_vietnamese_words(v: int | None) -> str:
     if v is None:
         return ""
@@ -90,98 +152,54 @@ def money_to_vietnamese_words(v: int | None) -> str:
     negative = n < 0
     n = abs(n)
 
-    digits = [
-        "không",
-        "một",
-        "hai",
-        "ba",
-        "bốn",
-        "năm",
-        "sáu",
-        "bảy",
-        "tám",
-        "chín",
-    ]
-    scales = [
-        "",
-        "nghìn",
-        "triệu",
-        "tỷ",
-        "nghìn tỷ",
-        "triệu tỷ",
-        "tỷ tỷ",
-    ]
-
-    def read_two_digits(tens: int, ones: int, *, has_hundreds: bool) -> list[str]:
-        out: list[str] = []
-        if tens == 0:
-            if ones != 0:
-                if has_hundreds:
-                    out.append("lẻ")
-                if ones == 5 and has_hundreds:
-                    out.append("lăm")
-                else:
-                    out.append(digits[ones])
-            return out
-        if tens == 1:
-            out.append("mười")
-            if ones == 0:
-                return out
-            if ones == 5:
-                out.append("lăm")
-            else:
-                out.append(digits[ones])
-            return out
-
-        out.append(digits[tens])
-        out.append("mươi")
-        if ones == 0:
-            return out
-        if ones == 1:
-            out.append("mốt")
-        elif ones == 4:
-            out.append("tư")
-        elif ones == 5:
-            out.append("lăm")
-        else:
-            out.append(digits[ones])
-        return out
-
-    def read_three_digits(num: int, *, force_full: bool) -> list[str]:
-        h = num // 100
-        t = (num // 10) % 10
-        o = num % 10
-        out: list[str] = []
-
-        if h != 0 or force_full:
-            out.append(digits[h])
-            out.append("trăm")
-            out.extend(read_two_digits(t, o, has_hundreds=True))
-            return out
-
-        out.extend(read_two_digits(t, o, has_hundreds=False))
-        return out
-
     parts: list[str] = []
-    group_index = 0
-    while n > 0 and group_index < len(scales):
+    for scale in _VI_SCALES:
+        if n <= 0:
+            break
         group = n % 1000
         n //= 1000
         if group != 0:
-            force_full = n > 0
-            chunk = read_three_digits(group, force_full=force_full)
-            scale = scales[group_index]
-            if scale:
-                chunk.append(scale)
-            parts = chunk + parts
-        group_index += 1
-
-    s = " ".join([p for p in parts if p]).strip()
+            words = _VI_THREE_DIGITS_FULL[group] if n > 0 else _VI_THREE_DIGITS_SHORT[group]
+            parts.append(f"{words} {scale}" if scale else words)
+
+    s = " ".join(reversed(parts))
     if negative:
         s = f"âm {s}".strip()
     return f"{s} đồng".strip()
 
 
+def format_error_message(e: BaseException) -> str:
+    name = type(e).__name__
+    errors = getattr(e, "errors", None)
+    if callable(errors):
+        # pydantic ValidationError: one "<field>: <message>" per failing field
+        try:
+            parts = [
+                f"{'.'.join(str(x) for x in err.get('loc', ()))}: {err.get('msg', '')}"
+                for err in errors()
+            ]
+        except Exception:
+            parts = []
+        if parts:
+            return f"{name}: " + "; ".join(parts)
+    error_str = str(e)
+    if not error_str:
+        return name
+    return f"{name}: {error_str}"
+
+
+def log_route_error(logger: logging.Logger, message: str, *args) -> None:
+    """Log the exception being handled in a route's except block.
+
+    ValueError (user input / validation, pydantic included) is expected and goes to DEBUG;
+    anything else is unexpected and is logged with its traceback at ERROR.
+    """
+    if isinstance(sys.exc_info()[1], ValueError):
+        logger.debug(message, *args, exc_info=True)
+    else:
+        logger.exception(message, *args)
+
+
 def get_breadcrumbs(path: str):
     breadcrumbs = [{"label": "Trang chủ", "url": "/"}]
 
@@ -3,82 +3,67 @@
 Convert .docx file with <placeholder> format to {{placeholder}} format for docxtpl
 Uses proper XML parsing to handle text nodes correctly
 """
-import zipfile
 import re
 import sys
-import tempfile
-import shutil
 from pathlib import Path
 from lxml import etree
 
+from docx_zip import create_docx, is_word_xml, open_docx, write_entry
 
-def convert_text_nodes(content: str) -> str:
-    """Convert <placeholder> to {{placeholder}} in text, handling Word's text splitting"""
+W_T = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t'
+
+# <placeholder>, tolerating the spaces Word inserts when it splits a run
+_PLACEHOLDER_RE = re.compile(r'<\s*([a-z_][a-z0-9_\s]+)\s*>')
 
-    # Step 1: Clean up spaces inside <...> that Word might have split
-    # Example: "< nga y _ky_hop_dong >" → "<ngay_ky_hop_dong>"
-    def clean_spaces(match):
-        return '<' + ''.join(match.group(1).split()) + '>'
 
-    content = re.sub(r'<\s*([a-z_][a-z0-9_\s]+)\s*>', clean_spaces, content)
+def _placeholder_repl(match) -> str:
+    # Example: "< nga y _ky_hop_dong >" → "{{ngay_ky_hop_dong}}"
+    name = ''.join(match.group(1).split())
+    if len(name) < 2:
+        # Too short to be one of our placeholders; only drop the spaces
+        return '<' + name + '>'
+    return '{{' + name + '}}'
 
-    # Step 2: Convert <placeholder> to {{placeholder}}
-    # Only match patterns that look like our placeholders
-    content = re.sub(r'<([a-z_][a-z0-9_]+)>', r'{{\1}}', content)
 
-    return content
+def convert_text_nodes(content: str) -> str:
+    """Convert <placeholder> to {{placeholder}} in text, handling Word's text splitting"""
+    return _PLACEHOLDER_RE.sub(_placeholder_repl, content)
+
+
+def _convert_xml_part(name: str, data: bytes) -> bytes:
+    try:
+        root = etree.fromstring(data)
+
+        # Walk text nodes (w:t elements) directly instead of evaluating an XPath
+        for t_elem in root.iter(W_T):
+            if t_elem.text:
+                # Convert placeholders in text content
+                t_elem.text = convert_text_nodes(t_elem.text)
+
+        return etree.tostring(
+            root.getroottree(),
+            xml_declaration=True,
+            encoding='UTF-8',
+            standalone=True
+        )
+    except Exception as e:
+        print(f"Warning: Could not process {Path(name).name}: {e}")
+        # If XML parsing fails, fallback to string replacement
+        return convert_text_nodes(data.decode('utf-8')).encode('utf-8')
 
 
 def convert_docx_to_template(input_path: Path, output_path: Path) -> None:
     """Convert <placeholder> to {{placeholder}} in .docx XML files"""
 
-    tmp_dir = Path(tempfile.mkdtemp(prefix="docx_convert_"))
-    ns = {'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'}
+    # Only the word/ XML parts are parsed; everything else is copied through
+    with open_docx(input_path) as zin, create_docx(output_path) as zout:
+        for item in zin.infolist():
+            data = zin.read(item)
+            if is_word_xml(item.filename):
+                data = _convert_xml_part(item.filename, data)
+            write_entry(zout, item, data)
 
-    try:
-        with zipfile.ZipFile(input_path, 'r') as zin:
-            zin.extractall(tmp_dir)
-
-        # Process all XML files in word/ directory
-        word_dir = tmp_dir / 'word'
-        if word_dir.exists():
-            for xml_file in word_dir.glob('*.xml'):
-                try:
-                    tree = etree.parse(str(xml_file))
-                    root = tree.getroot()
-
-                    # Find all text nodes (w:t elements)
-                    for t_elem in root.xpath('.//w:t', namespaces=ns):
-                        if t_elem.text:
-                            # Convert placeholders in text content
-                            t_elem.text = convert_text_nodes(t_elem.text)
-
-                    # Save modified XML
-                    tree.write(
-                        str(xml_file),
-                        xml_declaration=True,
-                        encoding='UTF-8',
-                        standalone='yes'
-                    )
-                except Exception as e:
-                    print(f"Warning: Could not process {xml_file.name}: {e}")
-                    # If XML parsing fails, fallback to string replacement
-                    content = xml_file.read_text(encoding='utf-8')
-                    content = convert_text_nodes(content)
-                    xml_file.write_text(content, encoding='utf-8')
-
-        # Create new .docx from modified files
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zout:
-            for file in tmp_dir.rglob('*'):
-                if file.is_file():
-                    arcname = file.relative_to(tmp_dir)
-                    zout.write(file, arcname)
-
-        print(f"✓ Converted: {input_path.name} → {output_path.name}")
-
-    finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+    print(f"✓ Converted: {input_path.name} → {output_path.name}")
 
 
 if __name__ == '__main__':
@@ -2,71 +2,51 @@
 """
 Convert .docx file with <placeholder> format to {{placeholder}} format for docxtpl
 """
-import zipfile
 import re
 import sys
-import tempfile
-import shutil
 from pathlib import Path
 
+from docx_zip import create_docx, is_word_xml, open_docx, write_entry
+
+# Both conversion steps need "<", optional spaces, then a lowercase letter or "_".
+# Parts without that (styles.xml, fontTable.xml, ...) are copied through untouched.
+_CANDIDATE_RE = re.compile(r'<\s*[a-z_]')
+_SPACED_PLACEHOLDER_RE = re.compile(r'<\s*([a-z_][a-z0-9_]*(?:\s+[a-z0-9_]+)*)\s*>')
+# XML tags carry a namespace prefix (w:p) or start with "/" or "?", so they never match.
+# Like the old <([^>]+)> scan this assumes well-formed XML: a "<" inside a comment or
+# CDATA is not markup, so "<!-- <ab> -->" would be converted; "<<ab>" is kept as is.
+_PLACEHOLDER_RE = re.compile(r'(?<!<)<([a-z_][a-z0-9_]*)>')
+
+
+def convert_xml_content(content: str) -> str:
+    """Convert <placeholder> to {{placeholder}} in one XML part"""
+
+    # Step 1: Remove spaces inside <...> tags that break placeholders
+    # Example: < nga y _ky_hop_dong > → <ngay_ky_hop_dong>
+    def clean_placeholder(match):
+        inner = ''.join(match.group(1).split())
+        return f'<{inner}>'
+
+    content = _SPACED_PLACEHOLDER_RE.sub(clean_placeholder, content)
+
+    # Step 2: Convert <placeholder> to {{placeholder}}
+    # Template replacement, no per-tag Python callback
+    return _PLACEHOLDER_RE.sub(r'{{\1}}', content)
+
 
 def convert_docx_to_template(input_path: Path, output_path: Path) -> None:
     """Convert <placeholder> to {{placeholder}} in .docx XML files"""
 
-    tmp_dir = Path(tempfile.mkdtemp(prefix="docx_convert_"))
-
-    try:
-        with zipfile.ZipFile(input_path, 'r') as zin:
-            # Extract all files
-            zin.extractall(tmp_dir)
-
-        # Process all XML files in word/ directory
-        word_dir = tmp_dir / 'word'
-        if word_dir.exists():
-            for xml_file in word_dir.glob('*.xml'):
-                content = xml_file.read_text(encoding='utf-8')
-
-                # Step 1: Remove spaces inside <...> tags that break placeholders
-                # Example: < nga y _ky_hop_dong > → <ngay_ky_hop_dong>
-                def clean_placeholder(match):
-                    inner = ''.join(match.group(1).split())
-                    return f'<{inner}>'
-
-                content = re.sub(
-                    r'<\s*([a-z_][a-z0-9_]*(?:\s+[a-z0-9_]+)*)\s*>',
-                    clean_placeholder,
-                    content
-                )
-
-                # Step 2: Convert <placeholder> to {{placeholder}}
-                # Only match <xxx> where xxx doesn't contain : (not XML namespace)
-                # and starts with lowercase letter or underscore
-                def convert_placeholder(match):
-                    tag_content = match.group(1)
-                    # Check if it's a XML tag (has : or starts with /)
-                    if ':' in tag_content or tag_content.startswith('/'):
-                        return match.group(0)  # Keep as is
-                    # Check if it matches placeholder pattern
-                    if re.match(r'^[a-z_][a-z0-9_]*$', tag_content):
-                        return '{{' + tag_content + '}}'
-                    return match.group(0)
-
-                content = re.sub(r'<([^>]+)>', convert_placeholder, content)
-
-                xml_file.write_text(content, encoding='utf-8')
-
-        # Create new .docx from modified files
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zout:
-            for file in tmp_dir.rglob('*'):
-                if file.is_file():
-                    arcname = file.relative_to(tmp_dir)
-                    zout.write(file, arcname)
-
-        print(f"✓ Converted: {input_path.name} → {output_path.name}")
-
-    finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+    with open_docx(input_path) as zin, create_docx(output_path) as zout:
+        for item in zin.infolist():
+            data = zin.read(item)
+            if is_word_xml(item.filename):
+                content = data.decode('utf-8')
+                if _CANDIDATE_RE.search(content):
+                    data = convert_xml_content(content).encode('utf-8')
+            write_entry(zout, item, data)
+
+    print(f"✓ Converted: {input_path.name} → {output_path.name}")
 
 
 if __name__ == '__main__':
@@ -0,0 +1,58 @@
+"""
+Archive plumbing shared by the .docx conversion scripts.
+"""
+import io
+import os
+import tempfile
+import zipfile
+from contextlib import contextmanager
+from pathlib import Path
+
+# 1 MiB file buffers so ZipFile's many small reads/writes don't each become a syscall
+ZIP_BUFFER_SIZE = 1 << 20
+# The output is a working template, not a distributable: favour deflate speed over size
+ZIP_COMPRESSLEVEL = 3
+
+
+def is_word_xml(name: str) -> bool:
+    """Top-level XML parts under word/ (document, headers, footers, ...)"""
+    return name.startswith('word/') and name.endswith('.xml') and '/' not in name[len('word/'):]
+
+
+@contextmanager
+def open_docx(path: Path):
+    """Read a .docx into memory, so the source file is not held open while the output is written"""
+    with zipfile.ZipFile(io.BytesIO(path.read_bytes()), 'r') as zin:
+        yield zin
+
+
+@contextmanager
+def create_docx(path: Path):
+    """Write a .docx through a buffered file handle, creating the parent directory"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Build the archive next to the target and swap it in once complete: the output may be
+    # the input itself, and a failed run must not leave a truncated file behind
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=path.name + '.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb', buffering=ZIP_BUFFER_SIZE) as f, \
+                zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED, compresslevel=ZIP_COMPRESSLEVEL) as zout:
+            yield zout
+        # mkstemp creates the file 0600; give it the mode a plain open() would have
+        try:
+            mode = path.stat().st_mode
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_name, mode)
+        os.replace(tmp_name, path)
+    except BaseException:
+        os.unlink(tmp_name)
+        raise
+
+
+def write_entry(zout: zipfile.ZipFile, item: zipfile.ZipInfo, data: bytes) -> None:
+    """Write data under the source entry's ZipInfo, keeping its compress_type"""
+    # Stored media stays stored; the level must be passed here since writestr
+    # ignores the archive default when given a ZipInfo
+    zout.writestr(item, data, compresslevel=ZIP_COMPRESSLEVEL)
@@ -6,94 +6,185 @@ Handles Word's tendency to split text across multiple <w:t> nodes.
 import zipfile
 import re
 import sys
-import tempfile
-import shutil
 from pathlib import Path
+from typing import Sequence
 
-import xml.etree.ElementTree as ET
+from docx_zip import create_docx, open_docx, write_entry
+
+# libxml2-backed parsing/serialisation when lxml is installed (it is in requirements.txt);
+# the stdlib ElementTree API is a drop-in fallback for everything used below.
+try:
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
 
 
 W_NS = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+W_P = f"{{{W_NS}}}p"
+W_T = f"{{{W_NS}}}t"
 ET.register_namespace("w", W_NS)
 
+# A group of consecutive w:t elements, and a single w:t element within it
+RUN_GROUP_RE = re.compile(r'(<w:t[^>]*>([^<]*)</w:t>)(\s*<w:t[^>]*>([^<]*)</w:t>)+')
+TEXT_NODE_RE = re.compile(r'<w:t[^>]*>([^<]*)</w:t>')
+
 
 def merge_text_runs(xml_content: str) -> str:
     """Merge consecutive <w:t> nodes to fix Word's text splitting"""
 
-    # Pattern to find consecutive w:t elements
-    pattern = r'(<w:t[^>]*>([^<]*)</w:t>)(\s*<w:t[^>]*>([^<]*)</w:t>)+'
+    # The group pattern is greedy, so one pass already merges each maximal run;
+    # rebuild from slices and join once instead of rescanning until nothing changes.
+    parts = []
+    pos = 0
+    for match in RUN_GROUP_RE.finditer(xml_content):
+        parts.append(xml_content[pos:match.start()])
 
-    def merge_runs(match):
         # Extract all text content from consecutive w:t nodes
-        text_pattern = r'<w:t[^>]*>([^<]*)</w:t>'
-        texts = re.findall(text_pattern, match.group(0))
-        merged_text = ''.join(texts)
-
-        # Decode HTML entities for < and >
-        merged_text = merged_text.replace('&lt;', '<').replace('&gt;', '>')
-
-        # Return a single w:t node with merged text
-        return f'<w:t>{merged_text}</w:t>'
-
-    # Keep merging until no more changes
-    prev_content = None
-    while prev_content != xml_content:
-        prev_content = xml_content
-        xml_content = re.sub(pattern, merge_runs, xml_content)
-
-    return xml_content
-
-
-def merge_text_runs_xml(xml_bytes: bytes) -> bytes:
-    ns = {"w": W_NS}
-    root = ET.fromstring(xml_bytes)
+        merged_text = ''.join(TEXT_NODE_RE.findall(match.group(0)))
+
+        # Decode HTML entities for < and >; most runs hold no entity at all
+        if '&' in merged_text:
+            merged_text = merged_text.replace('&lt;', '<').replace('&gt;', '>')
+
+        # Emit a single w:t node with merged text
+        parts.append(f'<w:t>{merged_text}</w:t>')
+        pos = match.end()
+    parts.append(xml_content[pos:])
+
+    return ''.join(parts)
+
+
+def _xml_prolog(head: bytes) -> bytes:
+    """The document's own <?xml ...?> declaration, if it has a UTF-8 one"""
+    if not head.startswith(b"<?xml"):
+        return b""
+    end = head.find(b"?>")
+    if end == -1:
+        return b""
+    prolog = head[:end + 2]
+    # We always serialise as UTF-8, so a declaration naming another encoding can't be reused
+    if b"encoding" in prolog and b"utf-8" not in prolog.lower():
+        return b""
+    return prolog
+
+
+def merge_text_runs_xml(source) -> bytes:
+    """Merge each paragraph's text nodes; source is XML bytes or a buffered binary stream"""
+    if isinstance(source, bytes):
+        prolog = _xml_prolog(source)
+        root = ET.fromstring(source)
+    else:
+        # peek() leaves the stream position alone, so the parser still sees the prolog
+        prolog = _xml_prolog(source.peek(512))
+        # Incremental parse from the stream: the raw XML is never held as one buffer
+        root = ET.parse(source).getroot()
 
     # Merge all text nodes within each paragraph to prevent placeholders being split across runs.
-    for p in root.findall(".//w:p", ns):
-        ts = p.findall(".//w:t", ns)
+    # .iter() walks the tree in C without compiling a path expression per paragraph.
+    for p in root.iter(W_P):
+        ts = list(p.iter(W_T))
         if len(ts) <= 1:
             continue
 
         merged = "".join([(t.text or "") for t in ts])
-        merged = merged.replace("&lt;", "<").replace("&gt;", ">")
+        # The parser has already decoded entities; only literal "&lt;" text is left to fold
+        if "&" in merged:
+            merged = merged.replace("&lt;", "<").replace("&gt;", ">")
 
         ts[0].text = merged
         for t in ts[1:]:
             t.text = ""
 
+    if prolog:
+        # Keep Word's original declaration (standalone="yes" included) verbatim
+        return prolog + b"\n" + ET.tostring(root, encoding="utf-8", xml_declaration=False)
     return ET.tostring(root, encoding="utf-8", xml_declaration=True)
 
 
-def convert_placeholders_xml(xml_bytes: bytes, placeholders: list) -> tuple[bytes, int]:
-    ns = {"w": W_NS}
-    root = ET.fromstring(xml_bytes)
+# Serialised <w:t> text nodes; "<" and ">" inside the text are entity-escaped, so
+# [^<]* is exactly the node text. (?:\s[^>]*)? keeps <w:tab/>, <w:tbl> etc. out.
+W_T_NODE_RE = re.compile(rb'(<w:t(?:\s[^>]*)?>)([^<]*)(</w:t>)')
+
+
+def _to_jinja(match) -> bytes:
+    return b"{{" + match.group(1) + b"}}"
 
-    count = 0
-    for t in root.findall(".//w:t", ns):
-        if not t.text:
-            continue
-        text_before = t.text
-        text_after = text_before
 
-        for placeholder in placeholders:
-            text_after = text_after.replace(f"<{placeholder}>", f"{{{{{placeholder}}}}}")
-            text_after = text_after.replace(f"< {placeholder} >", f"{{{{{placeholder}}}}}")
-            text_after = text_after.replace(placeholder, f"{{{{{placeholder}}}}}") if text_after == text_before else text_after
+# Compiled patterns per placeholder set; the same one or two sets are converted every run
+_PH_CACHE: dict[tuple[str, ...], tuple[re.Pattern, re.Pattern]] = {}
+_TEXT_RULES_CACHE: dict[tuple[str, ...], tuple] = {}
 
-        if text_after != text_before:
-            t.text = text_after
-            count += 1
 
-    return ET.tostring(root, encoding="utf-8", xml_declaration=True), count
+def placeholder_patterns(placeholders: Sequence[str]) -> tuple[re.Pattern, re.Pattern]:
+    """(bracketed, bare) bytes alternation patterns covering every placeholder"""
+    key = tuple(placeholders)
+    patterns = _PH_CACHE.get(key)
+    if patterns is None:
+        # Longest first, so so_hop_dong_day_du is not cut short by so_hop_dong
+        alt = b"|".join(re.escape(p.encode("utf-8")) for p in sorted(key, key=len, reverse=True))
+        # Only the escaped form can occur: the patterns run on serialised <w:t> text
+        bracketed = re.compile(rb"&lt;\s*(" + alt + rb")\s*&gt;")
+        bare = re.compile(b"(" + alt + b")")
+        patterns = _PH_CACHE[key] = (bracketed, bare)
+    return patterns
 
 
-def convert_placeholders(xml_content: str, placeholders: list) -> tuple:
+def convert_placeholders_xml(xml_bytes: bytes, placeholders: Sequence[str]) -> tuple[bytes, int]:
+    # Placeholder edits only touch text, so rewrite the serialised text nodes in place
+    # instead of paying for another parse + tostring round trip.
+    bracketed, bare = placeholder_patterns(placeholders)
+    count = 0
+
+    def convert_node(match):
+        nonlocal count
+        text_before = match.group(2)
+
+        # Most nodes are plain prose: without any placeholder name there is nothing to convert
+        if bare.search(text_before) is None:
+            return match.group(0)
+
+        # One scan for every <placeholder>; bare names are only converted in
+        # text nodes that had no bracketed placeholder, as before. Serialised text
+        # escapes "<", so a bracketed placeholder needs an "&lt;".
+        text_after = bracketed.sub(_to_jinja, text_before) if b"&lt;" in text_before else text_before
+        if text_after == text_before:
+            text_after = bare.sub(_to_jinja, text_before)
+        if text_after == text_before:
+            return match.group(0)
+
+        count += 1
+        return match.group(1) + text_after + match.group(3)
+
+    return W_T_NODE_RE.sub(convert_node, xml_bytes), count
+
+
+def _text_rules(placeholders: Sequence[str]) -> tuple:
+    """Per-placeholder compiled patterns for convert_placeholders, built once per set"""
+    key = tuple(placeholders)
+    rules = _TEXT_RULES_CACHE.get(key)
+    if rules is None:
+        compiled = []
+        for placeholder in key:
+            escaped = re.escape(placeholder)
+            compiled.append((
+                # Match placeholder in text nodes, with or without < > around it
+                re.compile(f'(<w:t[^>]*>)([^<]*{escaped}[^<]*)(</w:t>)'),
+                re.compile(r'<\s*' + escaped + r'\s*>'),
+                re.compile(r'&lt;\s*' + escaped + r'\s*&gt;'),
+                re.compile(r'\b' + escaped + r'\b'),
+                '{{' + placeholder + '}}',
+            ))
+        rules = _TEXT_RULES_CACHE[key] = tuple(compiled)
+    return rules
+
+
+def convert_placeholders(xml_content: str, placeholders: Sequence[str]) -> tuple:
     """Convert specific placeholders to Jinja2 format"""
 
+    compiled = _text_rules(placeholders)
+
     count = 0
-    for placeholder in placeholders:
-        # Match placeholder in text nodes, with or without < > around it
-        pattern = f'(<w:t[^>]*>)([^<]*{re.escape(placeholder)}[^<]*)(</w:t>)'
+    for text_node_re, angle_re, entity_re, bare_re, replacement in compiled:
 
         def replace_in_text(match):
             nonlocal count
@@ -102,78 +193,56 @@ def convert_placeholders(xml_content: str, placeholders: list) -> tuple:
             suffix = match.group(3)
 
             # Replace <placeholder> and &lt;placeholder&gt; with {{placeholder}}
-            new_text = re.sub(
-                r'<\s*' + re.escape(placeholder) + r'\s*>',
-                '{{' + placeholder + '}}',
-                text
-            )
+            new_text = angle_re.sub(replacement, text)
 
             if new_text == text:
-                new_text = re.sub(
-                    r'&lt;\s*' + re.escape(placeholder) + r'\s*&gt;',
-                    '{{' + placeholder + '}}',
-                    text,
-                )
+                new_text = entity_re.sub(replacement, text)
 
             # Also replace bare placeholder (without < >) with {{placeholder}}
             if new_text == text:
-                new_text = re.sub(
-                    r'\b' + re.escape(placeholder) + r'\b',
-                    '{{' + placeholder + '}}',
-                    text
-                )
+                new_text = bare_re.sub(replacement, text)
 
             if new_text != text:
                 count += 1
             return prefix + new_text + suffix
 
-        xml_content = re.sub(pattern, replace_in_text, xml_content)
+        xml_content = text_node_re.sub(replace_in_text, xml_content)
 
     return xml_content, count
 
 
-def convert_docx_to_template(input_path: Path, output_path: Path, placeholders: list) -> int:
+def convert_docx_to_template(input_path: Path, output_path: Path, placeholders: Sequence[str]) -> int:
     """Convert .docx placeholders to Jinja2 template format"""
-    
-    tmp_dir = Path(tempfile.mkdtemp(prefix="docx_convert_"))
+
     total_conversions = 0
-    
-    try:
-        # Extract docx
-        with zipfile.ZipFile(input_path, 'r') as zin:
-            zin.extractall(tmp_dir)
-        
-        # Process document.xml
-        doc_xml = tmp_dir / 'word' / 'document.xml'
-        if doc_xml.exists():
-            xml_bytes = doc_xml.read_bytes()
-
-            # Step 1: Merge split text runs (XML-safe)
-            xml_bytes = merge_text_runs_xml(xml_bytes)
-
-            # Step 2: Convert placeholders (XML-tree based, prefix-agnostic)
-            xml_bytes, count = convert_placeholders_xml(xml_bytes, placeholders)
-            total_conversions = count
-
-            # Save modified XML
-            doc_xml.write_bytes(xml_bytes)
-        
-        # Create new .docx
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zout:
-            for file in tmp_dir.rglob('*'):
-                if file.is_file():
-                    zout.write(file, file.relative_to(tmp_dir))
-        
-        return total_conversions
-    
-    finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Stream entries from the input archive; only word/document.xml is transformed in memory
+    with open_docx(input_path) as zin, create_docx(output_path) as zout:
+        for item in zin.infolist():
+            if item.filename == 'word/document.xml':
+                # Step 1: Merge split text runs (XML-safe), parsing straight from the inflating stream
+                with zin.open(item) as stream:
+                    data = merge_text_runs_xml(stream)
+
+                # Step 2: Convert placeholders (XML-tree based, prefix-agnostic)
+                data, count = convert_placeholders_xml(data, placeholders)
+                total_conversions = count
+
+                # The one rewritten part gets a fresh entry that is always deflated,
+                # even when the source archive stored it
+                info = zipfile.ZipInfo(item.filename, date_time=item.date_time)
+                info.compress_type = zipfile.ZIP_DEFLATED
+                info.external_attr = item.external_attr
+                write_entry(zout, info, data)
+                continue
+            write_entry(zout, item, zin.read(item))
+
+    return total_conversions
 
 
 if __name__ == '__main__':
     # Define all placeholders for contracts and annexes
-    CONTRACT_PLACEHOLDERS = [
+    CONTRACT_PLACEHOLDERS = (
         'so_hop_dong', 'linh_vuc', 'ten_kenh', 'link_kenh',
         'nguoi_dai_dien', 'chuc_vu', 'dia_chi', 'so_dien_thoai',
         'ma_so_thue', 'email', 'nguoi_thuc_hien_email',
@@ -182,12 +251,12 @@ if __name__ == '__main__':
         'so_tien_chua_GTGT', 'thue_GTGT', 'so_tien_GTGT',
         'so_tien_bang_chu',
         'TEN_DON_VI'
-    ]
+    )
     
-    ANNEX_PLACEHOLDERS = CONTRACT_PLACEHOLDERS + [
+    ANNEX_PLACEHOLDERS = CONTRACT_PLACEHOLDERS + (
         'so_hop_dong_day_du', 'so_phu_luc', 'ten_don_vi',
         'ngay_ky_phu_luc', 'thang_ky_phu_luc', 'nam_ky_phu_luc'
-    ]
+    )
     
     print("=" * 80)
     print("CONVERTING TEMPLATES")
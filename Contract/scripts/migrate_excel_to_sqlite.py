@@ -13,26 +13,33 @@ if str(PROJECT_ROOT) not in sys.path:
 
 from app.config import STORAGE_EXCEL_DIR  # noqa: E402
 from app.db import DB_PATH, engine, session_scope  # noqa: E402
-from app.db_models import Base, ContractRecordRow, WorkRow  # noqa: E402
+from app.db_models import Base, WorkRow  # noqa: E402
+from app.db_ops import _db_insert_contract_records  # noqa: E402
 from app.services.excel_store import read_contracts  # noqa: E402
 
 
-def _to_date(v):
-    if v is None:
+def _date_from_str(v: str):
+    s = v.strip()
+    if not s:
         return None
-    if isinstance(v, datetime):
-        return v.date()
-    if isinstance(v, date):
-        return v
-    if isinstance(v, str):
-        s = v.strip()
-        if not s:
-            return None
-        try:
-            return date.fromisoformat(s)
-        except Exception:
-            return None
-    return None
+    try:
+        return date.fromisoformat(s)
+    except Exception:
+        return None
+
+
+# Exact-type dispatch: openpyxl yields plain datetime/date/str cells, so one dict
+# lookup replaces the isinstance chain that ran for every migrated row.
+_DATE_CONVERTERS = {
+    datetime: datetime.date,
+    date: lambda v: v,
+    str: _date_from_str,
+}
+
+
+def _to_date(v):
+    conv = _DATE_CONVERTERS.get(type(v))
+    return conv(v) if conv is not None else None
 
 
 def _to_int(v):
@@ -64,118 +71,121 @@ def migrate_contracts() -> int:
         except Exception:
             year = None
 
-        rows = read_contracts(excel_path=p)
-        for r in rows:
-            # Normalize keys to our db schema
-            row = ContractRecordRow(
-                contract_no=(r.get("contract_no") or ""),
-                contract_year=int(r.get("contract_year") or year or 0),
-                annex_no=(r.get("annex_no") or None) or None,
-                ngay_lap_hop_dong=_to_date(r.get("ngay_lap_hop_dong")),
-                linh_vuc=r.get("linh_vuc"),
-                region_code=r.get("region_code"),
-                field_code=r.get("field_code"),
-                don_vi_ten=r.get("don_vi_ten"),
-                don_vi_dia_chi=r.get("don_vi_dia_chi"),
-                don_vi_dien_thoai=r.get("don_vi_dien_thoai"),
-                don_vi_nguoi_dai_dien=r.get("don_vi_nguoi_dai_dien"),
-                don_vi_chuc_vu=r.get("don_vi_chuc_vu"),
-                don_vi_mst=r.get("don_vi_mst"),
-                don_vi_email=r.get("don_vi_email"),
-                so_cccd=r.get("so_CCCD") or r.get("so_cccd"),
-                ngay_cap_cccd=r.get("ngay_cap_CCCD") or r.get("ngay_cap_cccd"),
-                kenh_ten=r.get("kenh_ten"),
-                kenh_id=r.get("kenh_id"),
-                nguoi_thuc_hien_email=r.get("nguoi_thuc_hien_email"),
-                so_tien_nhuan_but_value=_to_int(r.get("so_tien_nhuan_but_value")),
-                so_tien_nhuan_but_text=r.get("so_tien_nhuan_but_text"),
-                so_tien_chua_gtgt_value=_to_int(r.get("so_tien_chua_GTGT_value")),
-                so_tien_chua_gtgt_text=r.get("so_tien_chua_GTGT_text"),
-                thue_percent=(float(r.get("thue_percent")) if r.get("thue_percent") not in (None, "") else None),
-                thue_gtgt_value=_to_int(r.get("thue_GTGT_value")),
-                thue_gtgt_text=r.get("thue_GTGT_text"),
-                so_tien_value=_to_int(r.get("so_tien_value")),
-                so_tien_text=r.get("so_tien_text"),
-                so_tien_bang_chu=r.get("so_tien_bang_chu"),
-                docx_path=r.get("docx_path"),
-                catalogue_path=r.get("catalogue_path"),
+        records = []
+        for r in read_contracts(excel_path=p):
+            # Normalize values; read_contracts already maps header aliases (so_cccd, ...)
+            # onto the Excel/DB row-dict naming used by db_ops, so one lookup per key suffices
+            records.append(
+                {
+                    "contract_no": (r.get("contract_no") or ""),
+                    "contract_year": int(r.get("contract_year") or year or 0),
+                    "annex_no": (r.get("annex_no") or None) or None,
+                    "ngay_lap_hop_dong": _to_date(r.get("ngay_lap_hop_dong")),
+                    "linh_vuc": r.get("linh_vuc"),
+                    "region_code": r.get("region_code"),
+                    "field_code": r.get("field_code"),
+                    "don_vi_ten": r.get("don_vi_ten"),
+                    "don_vi_dia_chi": r.get("don_vi_dia_chi"),
+                    "don_vi_dien_thoai": r.get("don_vi_dien_thoai"),
+                    "don_vi_nguoi_dai_dien": r.get("don_vi_nguoi_dai_dien"),
+                    "don_vi_chuc_vu": r.get("don_vi_chuc_vu"),
+                    "don_vi_mst": r.get("don_vi_mst"),
+                    "don_vi_email": r.get("don_vi_email"),
+                    "so_CCCD": r.get("so_CCCD"),
+                    "ngay_cap_CCCD": r.get("ngay_cap_CCCD"),
+                    "kenh_ten": r.get("kenh_ten"),
+                    "kenh_id": r.get("kenh_id"),
+                    "nguoi_thuc_hien_email": r.get("nguoi_thuc_hien_email"),
+                    "so_tien_nhuan_but_value": _to_int(r.get("so_tien_nhuan_but_value")),
+                    "so_tien_nhuan_but_text": r.get("so_tien_nhuan_but_text"),
+                    "so_tien_chua_GTGT_value": _to_int(r.get("so_tien_chua_GTGT_value")),
+                    "so_tien_chua_GTGT_text": r.get("so_tien_chua_GTGT_text"),
+                    "thue_percent": (float(r.get("thue_percent")) if r.get("thue_percent") not in (None, "") else None),
+                    "thue_GTGT_value": _to_int(r.get("thue_GTGT_value")),
+                    "thue_GTGT_text": r.get("thue_GTGT_text"),
+                    "so_tien_value": _to_int(r.get("so_tien_value")),
+                    "so_tien_text": r.get("so_tien_text"),
+                    "so_tien_bang_chu": r.get("so_tien_bang_chu"),
+                    "docx_path": r.get("docx_path"),
+                    "catalogue_path": r.get("catalogue_path"),
+                }
             )
 
-            # Skip obviously bad rows
-            if not row.contract_no or not row.contract_year:
-                continue
-
-            try:
-                with session_scope() as db:
-                    db.add(row)
-                count += 1
-            except Exception:
-                # Likely duplicate uq; ignore and continue
-                continue
+        # Bad rows and keys that already exist are skipped by the bulk insert
+        count += _db_insert_contract_records(records)
 
     return count
 
 
-def migrate_works() -> int:
+def migrate_works(*, chunk_size: int = 500) -> int:
     count = 0
-    for p in sorted(STORAGE_EXCEL_DIR.glob("works_contract_*.xlsx")):
-        wb = load_workbook(str(p), data_only=True)
-        ws = wb["Works"] if "Works" in wb.sheetnames else wb.active
-        values = list(ws.iter_rows(values_only=True))
-        if not values:
-            wb.close()
-            continue
-
-        headers = [h if isinstance(h, str) else "" for h in list(values[0])]
-        header_map = {h: i for i, h in enumerate(headers) if h}
-
-        for row_vals in values[1:]:
-            if not any(row_vals):
+    # One session (and pooled connection) for every works file
+    with session_scope() as db:
+        for p in sorted(STORAGE_EXCEL_DIR.glob("works_contract_*.xlsx")):
+            wb = load_workbook(str(p), read_only=True, data_only=True)
+            try:
+                ws = wb["Works"]
+            except KeyError:
+                ws = wb.active
+            rows = ws.iter_rows(values_only=True)
+            header_row = next(rows, None)
+            if header_row is None:
+                wb.close()
                 continue
 
-            def g(key: str):
-                idx = header_map.get(key)
-                return row_vals[idx] if idx is not None and idx < len(row_vals) else None
-
-            rec = WorkRow(
-                year=int(g("year") or 0),
-                contract_no=str(g("contract_no") or ""),
-                annex_no=(str(g("annex_no") or "").strip() or None),
-                ngay_ky_hop_dong=str(g("ngay_ky_hop_dong") or ""),
-                ngay_ky_phu_luc=str(g("ngay_ky_phu_luc") or ""),
-                nguoi_thuc_hien=str(g("nguoi_thuc_hien") or ""),
-                ten_kenh=str(g("ten_kenh") or ""),
-                id_channel=str(g("id_channel") or ""),
-                link_kenh=str(g("link_kenh") or ""),
-                stt=_to_int(g("stt")),
-                id_link=str(g("id_link") or ""),
-                youtube_url=str(g("youtube_url") or ""),
-                id_work=str(g("id_work") or ""),
-                musical_work=str(g("musical_work") or ""),
-                author=str(g("author") or ""),
-                composer=str(g("composer") or ""),
-                lyricist=str(g("lyricist") or ""),
-                time_range=str(g("time_range") or ""),
-                duration=str(g("duration") or ""),
-                effective_date=str(g("effective_date") or ""),
-                expiration_date=str(g("expiration_date") or ""),
-                usage_type=str(g("usage_type") or ""),
-                royalty_rate=str(g("royalty_rate") or ""),
-                note=str(g("note") or ""),
-                imported_at=str(g("imported_at") or ""),
-            )
-
-            if not rec.year or not rec.contract_no:
-                continue
+            headers = [h if isinstance(h, str) else "" for h in header_row]
+            header_map = {h: i for i, h in enumerate(headers) if h}
+
+            pending: list[WorkRow] = []
+            for row_vals in rows:
+                if not any(row_vals):
+                    continue
+
+                def g(key: str):
+                    idx = header_map.get(key)
+                    return row_vals[idx] if idx is not None and idx < len(row_vals) else None
+
+                rec = WorkRow(
+                    year=int(g("year") or 0),
+                    contract_no=str(g("contract_no") or ""),
+                    annex_no=(str(g("annex_no") or "").strip() or None),
+                    ngay_ky_hop_dong=str(g("ngay_ky_hop_dong") or ""),
+                    ngay_ky_phu_luc=str(g("ngay_ky_phu_luc") or ""),
+                    nguoi_thuc_hien=str(g("nguoi_thuc_hien") or ""),
+                    ten_kenh=str(g("ten_kenh") or ""),
+                    id_channel=str(g("id_channel") or ""),
+                    link_kenh=str(g("link_kenh") or ""),
+                    stt=_to_int(g("stt")),
+                    id_link=str(g("id_link") or ""),
+                    youtube_url=str(g("youtube_url") or ""),
+                    id_work=str(g("id_work") or ""),
+                    musical_work=str(g("musical_work") or ""),
+                    author=str(g("author") or ""),
+                    composer=str(g("composer") or ""),
+                    lyricist=str(g("lyricist") or ""),
+                    time_range=str(g("time_range") or ""),
+                    duration=str(g("duration") or ""),
+                    effective_date=str(g("effective_date") or ""),
+                    expiration_date=str(g("expiration_date") or ""),
+                    usage_type=str(g("usage_type") or ""),
+                    royalty_rate=str(g("royalty_rate") or ""),
+                    note=str(g("note") or ""),
+                    imported_at=str(g("imported_at") or ""),
+                )
+
+                if not rec.year or not rec.contract_no:
+                    continue
+                pending.append(rec)
 
-            try:
-                with session_scope() as db:
-                    db.add(rec)
-                count += 1
-            except Exception:
-                continue
+            wb.close()
 
-        wb.close()
+            # Flushed in chunks instead of a commit per row
+            for i in range(0, len(pending), chunk_size):
+                db.add_all(pending[i : i + chunk_size])
+                db.flush()
+            # Rows are already flushed; drop them so the identity map doesn't grow across files
+            db.expunge_all()
+            count += len(pending)
 
     return count
 
@@ -2,67 +2,73 @@
 """
 Simple conversion: <placeholder> to {{placeholder}} using string replacement
 """
-import zipfile
 import re
 import sys
-import tempfile
 import shutil
 from pathlib import Path
 
+from docx_zip import create_docx, is_word_xml, open_docx, write_entry
 
-def convert_docx_placeholders(input_path: Path, output_path: Path) -> None:
-    """Convert <placeholder> to {{placeholder}} in .docx text nodes"""
-
-    tmp_dir = Path(tempfile.mkdtemp(prefix="docx_convert_"))
-
-    try:
-        with zipfile.ZipFile(input_path, 'r') as zin:
-            zin.extractall(tmp_dir)
-
-        # Process all XML files in word/ directory
-        word_dir = tmp_dir / 'word'
-        placeholders_found = set()
-
-        if word_dir.exists():
-            for xml_file in word_dir.glob('*.xml'):
-                content = xml_file.read_text(encoding='utf-8')
-                original = content
-
-                # Step 1: Clean up spaces between < and > that Word splits
-                # Example: "< nga y _ky_hop_dong >" → "<ngay_ky_hop_dong>"
-                def clean_spaces(match):
-                    cleaned = ''.join(match.group(1).split())
-                    placeholders_found.add(cleaned)
-                    return '<' + cleaned + '>'
+# "< nga y _ky_hop_dong >" as Word splits it, and the cleaned-up <ngay_ky_hop_dong>.
+# Bytes patterns: the markup is ASCII, so the UTF-8 parts never need decoding.
+_CLEAN_RE = re.compile(rb'<\s*([a-z_][a-z0-9_\s]+?)\s*>')
+_PH_RE = re.compile(rb'<([a-z_][a-z0-9_]+)>')
 
-                content = re.sub(r'<\s*([a-z_][a-z0-9_\s]+?)\s*>', clean_spaces, content)
 
-                # Step 2: Convert <placeholder> to {{placeholder}}
-                def convert_placeholder(match):
-                    placeholder = match.group(1)
-                    placeholders_found.add(placeholder)
-                    return '{{' + placeholder + '}}'
-
-                content = re.sub(r'<([a-z_][a-z0-9_]+)>', convert_placeholder, content)
-
-                if content != original:
-                    xml_file.write_text(content, encoding='utf-8')
-
-        # Create new .docx from modified files
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_DEFLATED) as zout:
-            for file in tmp_dir.rglob('*'):
-                if file.is_file():
-                    arcname = file.relative_to(tmp_dir)
-                    zout.write(file, arcname)
-
-        print(f"✓ Converted: {input_path.name} → {output_path.name}")
-        print(f"✓ Found {len(placeholders_found)} placeholders:")
-        for p in sorted(placeholders_found):
-            print(f"  - {{{{{p}}}}}")
+def convert_docx_placeholders(input_path: Path, output_path: Path) -> None:
+    """Convert <placeholder> to {{placeholder}} in .docx text nodes"""
 
-    finally:
-        shutil.rmtree(tmp_dir, ignore_errors=True)
+    placeholders_found = set()
+    converted = {}
+
+    # Step 1: Clean up spaces between < and > that Word splits
+    # Example: "< nga y _ky_hop_dong >" → "<ngay_ky_hop_dong>"
+    def clean_spaces(match):
+        cleaned = b''.join(match.group(1).split())
+        placeholders_found.add(cleaned.decode('ascii'))
+        return b'<' + cleaned + b'>'
+
+    # Step 2: Convert <placeholder> to {{placeholder}}
+    def convert_placeholder(match):
+        placeholder = match.group(1)
+        placeholders_found.add(placeholder.decode('ascii'))
+        return b'{{' + placeholder + b'}}'
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open_docx(input_path) as zin:
+        items = zin.infolist()
+
+        # Pass 1: convert the word/ XML parts in memory, keeping only the ones that changed
+        for item in items:
+            if not is_word_xml(item.filename):
+                continue
+            content = zin.read(item)
+            original = content
+
+            content = _CLEAN_RE.sub(clean_spaces, content)
+            content = _PH_RE.sub(convert_placeholder, content)
+
+            if content != original:
+                converted[item.filename] = content
+
+        if not converted:
+            # Nothing to rewrite (e.g. an already converted template): copy the archive
+            # byte for byte instead of inflating and re-deflating every entry
+            if input_path.resolve() != output_path.resolve():
+                shutil.copyfile(input_path, output_path)
+        else:
+            # Pass 2: write the archive, substituting only the converted parts
+            with create_docx(output_path) as zout:
+                for item in items:
+                    data = converted.get(item.filename)
+                    if data is None:
+                        data = zin.read(item)
+                    write_entry(zout, item, data)
+
+    print(f"✓ Converted: {input_path.name} → {output_path.name}")
+    print(f"✓ Found {len(placeholders_found)} placeholders:")
+    for p in sorted(placeholders_found):
+        print(f"  - {{{{{p}}}}}")
 
 
 if __name__ == '__main__':